@@ -264,7 +264,9 @@ class Build(base.ResourceType):
 
     @base.updateMethod
     @defer.inlineCallbacks
-    def finishBuild(self, buildid, results):
-        res = yield self.master.db.builds.finishBuild(buildid=buildid, results=results)
+    def finishBuild(self, buildid, results, state_string=None):
+        res = yield self.master.db.builds.finishBuild(
+            buildid=buildid, results=results, state_string=state_string
+        )
         yield self.generateEvent(buildid, "finished")
         return res
@@ -269,11 +269,14 @@ class BuildsConnectorComponent(base.DBConnectorComponent):
         return self.db.pool.do_with_transaction(thd)
 
     # returns a Deferred that returns None
-    def finishBuild(self, buildid, results):
+    def finishBuild(self, buildid, results, state_string=None):
         def thd(conn):
             tbl = self.db.model.builds
             q = tbl.update().where(tbl.c.id == buildid)
-            conn.execute(q.values(complete_at=int(self.master.reactor.seconds()), results=results))
+            values = {"complete_at": int(self.master.reactor.seconds()), "results": results}
+            if state_string is not None:
+                values["state_string"] = state_string
+            conn.execute(q.values(**values))
 
         return self.db.pool.do_with_transaction(thd)
 
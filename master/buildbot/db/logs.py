@@ -219,24 +219,24 @@ class LogsConnectorComponent(base.DBConnectorComponent):
         # fact that no character but u'\n' maps to b'\n' in UTF-8.
         remaining = content
         chunk_first_line = last_line = first_line
+        rows = []
         while remaining:
             chunk, remaining = self._splitBigChunk(remaining, logid)
             last_line = chunk_first_line + chunk.count(b'\n')
 
             chunk, compressed_id = self.thdCompressChunk(chunk)
-            res = conn.execute(
-                self.db.model.logchunks.insert(),
-                {
-                    "logid": logid,
-                    "first_line": chunk_first_line,
-                    "last_line": last_line,
-                    "content": chunk,
-                    "compressed": compressed_id,
-                },
-            )
-            conn.commit()
-            res.close()
+            rows.append({
+                "logid": logid,
+                "first_line": chunk_first_line,
+                "last_line": last_line,
+                "content": chunk,
+                "compressed": compressed_id,
+            })
             chunk_first_line = last_line + 1
+        # insert all the chunks with a single statement, and commit them together with the
+        # new line count so that readers never see a partially appended content
+        if rows:
+            conn.execute(self.db.model.logchunks.insert(), rows).close()
         res = conn.execute(
             self.db.model.logs.update()
             .where(self.db.model.logs.c.id == logid)
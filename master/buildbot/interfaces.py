@@ -22,34 +22,52 @@ Define the interfaces that are implemented by various buildbot classes.
 # pylint: disable=no-self-argument
 # pylint: disable=no-method-argument
 # pylint: disable=inherit-non-class
+# pylint: disable=unexpected-special-method-signature
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from zope.interface import Attribute
 from zope.interface import Interface
 
+if TYPE_CHECKING:
+    from typing import Any
+
 # exceptions that can be raised while trying to start a build
 
 
 class BuilderInUseError(Exception):
-    pass
+    __slots__ = ()
 
 
 class WorkerSetupError(Exception):
-    pass
+    __slots__ = ()
 
 
-class LatentWorkerFailedToSubstantiate(Exception):
-    def __str__(self):
-        return " ".join(str(arg) for arg in self.args)
+class _LatentWorkerSubstantiationError(Exception):
+    # these exceptions are stringified several times when a failure is logged, so the message
+    # is joined once when the exception is created
+    __slots__ = ('_msg',)
 
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._msg = " ".join(map(str, args))
 
-class LatentWorkerCannotSubstantiate(Exception):
     def __str__(self):
-        return " ".join(str(arg) for arg in self.args)
+        return self._msg
 
 
-class LatentWorkerSubstantiatiationCancelled(Exception):
-    def __str__(self):
-        return " ".join(str(arg) for arg in self.args)
+class LatentWorkerFailedToSubstantiate(_LatentWorkerSubstantiationError):
+    __slots__ = ()
+
+
+class LatentWorkerCannotSubstantiate(_LatentWorkerSubstantiationError):
+    __slots__ = ()
+
+
+class LatentWorkerSubstantiatiationCancelled(_LatentWorkerSubstantiationError):
+    __slots__ = ()
 
 
 class IPlugin(Interface):
@@ -125,6 +143,15 @@ class IEmailSender(Interface):
 
 
 class IEmailLookup(Interface):
+    """Maps user names to email addresses.
+
+    Providers may additionally implement C{getAddresses(users)}, which takes
+    a list of user names and returns a list of addresses (or None) in the
+    same order, or a Deferred which will fire with it. When present, it is
+    used instead of calling L{getAddress} once per user, which allows
+    lookups backed by external services to resolve all users at once.
+    """
+
     def getAddress(user):
         """Turn a User-name string into a valid email address. Either return
         a string (with an @ in it), None (to indicate that the user cannot
@@ -201,7 +228,13 @@ class ILatentMachine(IMachine):
 
 
 class IRenderable(Interface):
-    """An object that can be interpolated with properties from a build."""
+    """An object that can be interpolated with properties from a build.
+
+    Implementations whose rendering does not depend on the properties may set
+    a true ``cacheable`` class attribute. L{IProperties.render} then calls
+    L{getRenderingFor} only once per L{IProperties} provider and returns the
+    same result to all later callers.
+    """
 
     def getRenderingFor(iprops):
         """Return a deferred that fires with interpolation with the given properties
@@ -215,7 +248,7 @@ class IProperties(Interface):
     An object providing access to build properties
     """
 
-    def getProperty(name, default=None):
+    def getProperty(name: str, default: Any = None) -> Any:
         """Get the named property, returning the default if the property does
         not exist.
 
@@ -227,7 +260,7 @@ class IProperties(Interface):
         @returns: property value
         """
 
-    def hasProperty(name):
+    def hasProperty(name: str) -> bool:
         """Return true if the named property exists.
 
         @param name: property name
@@ -235,9 +268,29 @@ class IProperties(Interface):
         @returns: boolean
         """
 
-    def has_key(name):
+    def has_key(name: str) -> bool:
         """Deprecated name for L{hasProperty}."""
 
+    def __contains__(name: str) -> bool:
+        """Same as L{hasProperty}, allows C{name in props}."""
+
+    def __getitem__(name: str) -> Any:
+        """Return the value of the named property, raising L{KeyError} if the
+        property does not exist."""
+
+    def get(name: str, default: Any = None) -> Any:
+        """Same as L{getProperty}. Use this instead of a L{hasProperty} check
+        followed by L{getProperty} to look the property up only once."""
+
+    def asDict() -> dict[str, tuple[Any, str]]:
+        """Return all properties at once, as a dictionary mapping each property
+        name to a C{(value, source)} tuple. The dictionary is a copy and may be
+        modified by the caller.
+
+        Prefer this to calling L{getProperty} for each property when all of
+        them are needed.
+        """
+
     def setProperty(name, value, source, runtime=False):
         """Set the given property, overwriting any existing value.  The source
         describes the source of the value for human interpretation.
@@ -279,7 +332,8 @@ class IProperties(Interface):
     def render(value):
         """Render @code{value} as an L{IRenderable}.  This essentially coerces
         @code{value} to an L{IRenderable} and calls its @L{getRenderingFor}
-        method.
+        method. Renderings of renderables that set a true ``cacheable``
+        attribute are reused across calls.
 
         @name value: value to render
         @returns: rendered value
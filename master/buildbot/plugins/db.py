@@ -210,13 +210,14 @@ class _Plugins:
     represent plugins within a namespace
     """
 
-    def __init__(self, namespace, interface=None):
+    def __init__(self, namespace, interface=None, get_entry_points=None):
         if interface is not None:
             assert interface.isOrExtends(IPlugin)
 
         self._group = f'{_NAMESPACE_BASE}.{namespace}'
 
         self._interface = interface
+        self._get_entry_points = get_entry_points
         self._real_tree = None
 
     def _load_entry(self, entry):
@@ -241,7 +242,10 @@ class _Plugins:
     def _tree(self):
         if self._real_tree is None:
             self._real_tree = _NSNode()
-            entries = entry_points_get(entry_points(), self._group)
+            all_entries = (
+                entry_points() if self._get_entry_points is None else self._get_entry_points()
+            )
+            entries = entry_points_get(all_entries, self._group)
             for entry in entries:
                 self._real_tree.add(entry.name, _PluginEntry(self._group, entry, self._load_entry))
         return self._real_tree
@@ -295,6 +299,13 @@ class _PluginDB:
 
     def __init__(self):
         self._namespaces = {}
+        self._entry_points = None
+
+    def _get_entry_points(self):
+        # entry_points() scans all installed distributions, so do it once for all namespaces
+        if self._entry_points is None:
+            self._entry_points = entry_points()
+        return self._entry_points
 
     def add_namespace(self, namespace, interface=None, load_now=False):
         """
@@ -305,7 +316,7 @@ class _PluginDB:
         tempo = self._namespaces.get(namespace)
 
         if tempo is None:
-            tempo = _Plugins(namespace, interface)
+            tempo = _Plugins(namespace, interface, self._get_entry_points)
             self._namespaces[namespace] = tempo
 
         if load_now:
@@ -15,6 +15,8 @@
 
 from __future__ import annotations
 
+import itertools
+from collections import deque
 from functools import reduce
 from typing import TYPE_CHECKING
 
@@ -42,12 +44,23 @@ from buildbot.reporters.utils import getURLForBuild
 from buildbot.util import Notifier
 from buildbot.util import bytes2unicode
 from buildbot.util.eventual import eventually
+from buildbot.util.twisted import async_to_deferred
 
 if TYPE_CHECKING:
     from buildbot.process.builder import Builder
     from buildbot.process.workerforbuilder import AbstractWorkerForBuilder
 
 
+# the build state text for the results of a build whose steps have all run
+_RESULTS_TEXT = {
+    FAILURE: ("failed",),
+    WARNINGS: ("warnings",),
+    EXCEPTION: ("exception",),
+    RETRY: ("retry",),
+    CANCELLED: ("cancelled",),
+}
+
+
 class Build(properties.PropertiesMixin):
     """I represent a single build by a single worker. Specialized Builders can
     use subclasses of Build to hold status information unique to those build
@@ -90,6 +103,7 @@ class Build(properties.PropertiesMixin):
 
         self.locks = []  # list of lock accesses
         self._locks_to_acquire = []  # list of (real_lock, access) tuples
+        self._owned_locks = []  # the subset of _locks_to_acquire that has been claimed
         # build a source stamp
         self.sources = requests[0].mergeSourceStampsWith(requests[1:])
         self.reason = requests[0].mergeReasons(requests[1:])
@@ -130,8 +144,15 @@ class Build(properties.PropertiesMixin):
     def setLocks(self, lockList):
         self.locks = lockList
 
-    @defer.inlineCallbacks
     def _setup_locks(self):
+        if isinstance(self.locks, list) and not self.locks:
+            # most builds don't use locks; no need to render anything
+            self._locks_to_acquire = []
+            return defer.succeed(None)
+        return self._setup_locks_impl()
+
+    @defer.inlineCallbacks
+    def _setup_locks_impl(self):
         self._locks_to_acquire = yield get_real_locks_from_accesses(self.locks, self)
 
     def setWorkerEnvironment(self, env):
@@ -140,11 +161,24 @@ class Build(properties.PropertiesMixin):
         # builder directly)
         self.workerEnvironment = env
 
+    @property
+    def sources(self):
+        return self._sources
+
+    @sources.setter
+    def sources(self, sources):
+        self._sources = sources
+        # the lookups derived from the sources are computed lazily, and recomputed only when
+        # the sources are replaced
+        self._all_changes = None
+        self._blamelist = None
+        self._sources_by_codebase = None
+
     def getSourceStamp(self, codebase=''):
-        for source in self.sources:
-            if source.codebase == codebase:
-                return source
-        return None
+        if self._sources_by_codebase is None:
+            # the first source stamp of a codebase wins
+            self._sources_by_codebase = {s.codebase: s for s in reversed(self.sources)}
+        return self._sources_by_codebase.get(codebase)
 
     def getAllSourceStamps(self):
         return list(self.sources)
@@ -155,15 +189,13 @@ class Build(properties.PropertiesMixin):
             yield from s.changes
 
     def allChanges(self):
-        return Build.allChangesFromSources(self.sources)
+        if self._all_changes is None:
+            self._all_changes = list(Build.allChangesFromSources(self.sources))
+        return iter(self._all_changes)
 
     def allFiles(self):
         # return a list of all source files that were changed
-        files = []
-        for c in self.allChanges():
-            for f in c.files:
-                files.append(f)
-        return files
+        return list(itertools.chain.from_iterable(c.files for c in self.allChanges()))
 
     def __repr__(self):
         return (
@@ -176,22 +208,18 @@ class Build(properties.PropertiesMixin):
         # buildbot.reporters.utils.getResponsibleUsersForBuild, but using the data api.
         # it is important for the UI to have the blamelist easily available.
         # The best way is to make sure the owners property is set to full blamelist
-        blamelist = []
-        for c in self.allChanges():
-            if c.who not in blamelist:
-                blamelist.append(c.who)
-        for source in self.sources:
-            if source.patch:  # Add patch author to blamelist
-                blamelist.append(source.patch_info[0])
-        blamelist.sort()
-        return blamelist
+        if self._blamelist is None:
+            blamelist = list(dict.fromkeys(c.who for c in self.allChanges()))
+            # Add patch author to blamelist
+            blamelist.extend(s.patch_info[0] for s in self.sources if s.patch)
+            blamelist.sort()
+            self._blamelist = blamelist
+        return list(self._blamelist)
 
     def changesText(self):
-        changetext = ""
-        for c in self.allChanges():
-            changetext += "-" * 60 + "\n\n" + c.asText() + "\n"
+        separator = "-" * 60 + "\n\n"
         # consider sorting these by number
-        return changetext
+        return "".join(f"{separator}{c.asText()}\n" for c in self.allChanges())
 
     def setStepFactories(self, step_factories):
         """Set a list of 'step factories', which are tuples of (class,
@@ -212,7 +240,9 @@ class Build(properties.PropertiesMixin):
 
     @staticmethod
     @defer.inlineCallbacks
-    def setup_properties_known_before_build_starts(props, requests, builder, workerforbuilder=None):
+    def setup_properties_known_before_build_starts(
+        props, requests, builder, workerforbuilder=None, sources=None
+    ):
         # Note that this function does not setup the 'builddir' worker property
         # It's not possible to know it until before the actual worker has
         # attached.
@@ -221,7 +251,8 @@ class Build(properties.PropertiesMixin):
         props.updateFromProperties(builder.master.config.properties)
 
         # from the SourceStamps, which have properties via Change
-        sources = requests[0].mergeSourceStampsWith(requests[1:])
+        if sources is None:
+            sources = requests[0].mergeSourceStampsWith(requests[1:])
         for change in Build.allChangesFromSources(sources):
             props.updateFromProperties(change.properties)
 
@@ -275,31 +306,36 @@ class Build(properties.PropertiesMixin):
         self.workername = workerforbuilder.worker.workername
         self.worker_info = workerforbuilder.worker.info
 
-    @defer.inlineCallbacks
     def getBuilderId(self):
-        if self._builderid is None:
-            if self.hasProperty(self.VIRTUAL_BUILDERNAME_PROP):
-                self._builderid = yield self.builder.getBuilderIdForName(
-                    self.getProperty(self.VIRTUAL_BUILDERNAME_PROP)
-                )
-                description = self.getProperty(
-                    self.VIRTUAL_BUILDERDESCRIPTION_PROP, self.builder.config.description
-                )
-                project = self.getProperty(
-                    self.VIRTUAL_BUILDER_PROJECT_PROP, self.builder.config.project
-                )
-                tags = self.getProperty(self.VIRTUAL_BUILDERTAGS_PROP, self.builder.config.tags)
-                if type(tags) == type([]) and '_virtual_' not in tags:
-                    tags.append('_virtual_')
-
-                projectid = yield self.builder.find_project_id(project)
-                # Note: not waiting for updateBuilderInfo to complete
-                self.master.data.updates.updateBuilderInfo(
-                    self._builderid, description, None, None, projectid, tags
-                )
+        if self._builderid is not None:
+            return defer.succeed(self._builderid)
+        return self._get_builder_id_impl()
 
-            else:
-                self._builderid = yield self.builder.getBuilderId()
+    @defer.inlineCallbacks
+    def _get_builder_id_impl(self):
+        if self.hasProperty(self.VIRTUAL_BUILDERNAME_PROP):
+            self._builderid = yield self.builder.getBuilderIdForName(
+                self.getProperty(self.VIRTUAL_BUILDERNAME_PROP)
+            )
+            description = self.getProperty(
+                self.VIRTUAL_BUILDERDESCRIPTION_PROP, self.builder.config.description
+            )
+            project = self.getProperty(
+                self.VIRTUAL_BUILDER_PROJECT_PROP, self.builder.config.project
+            )
+            tags = self.getProperty(self.VIRTUAL_BUILDERTAGS_PROP, self.builder.config.tags)
+            if isinstance(tags, list) and '_virtual_' not in tags:
+                # don't modify the tags list of the builder configuration
+                tags = [*tags, '_virtual_']
+
+            projectid = yield self.builder.find_project_id(project)
+            # Note: not waiting for updateBuilderInfo to complete
+            self.master.data.updates.updateBuilderInfo(
+                self._builderid, description, None, None, projectid, tags
+            )
+
+        else:
+            self._builderid = yield self.builder.getBuilderId()
         return self._builderid
 
     @defer.inlineCallbacks
@@ -311,6 +347,7 @@ class Build(properties.PropertiesMixin):
         self.conn = None
 
         worker = workerforbuilder.worker
+        updates = self.master.data.updates
 
         # Cache the worker information as variables instead of accessing via worker, as the worker
         # will disappear during disconnection and some of these properties may still be needed.
@@ -323,7 +360,7 @@ class Build(properties.PropertiesMixin):
         # then we just assign the build to the first buildrequest
         brid = self.requests[0].id
         builderid = yield self.getBuilderId()
-        self.buildid, self.number = yield self.master.data.updates.addBuild(
+        self.buildid, self.number = yield updates.addBuild(
             builderid=builderid, buildrequestid=brid, workerid=worker.workerid
         )
         self._buildid_notifier.notify(self.buildid)
@@ -348,7 +385,7 @@ class Build(properties.PropertiesMixin):
         )
         self._preparation_step.setBuild(self)
         yield self._preparation_step.addStep()
-        yield self.master.data.updates.startStep(self._preparation_step.stepid, locks_acquired=True)
+        yield updates.startStep(self._preparation_step.stepid, locks_acquired=True)
 
         Build.setupBuildProperties(self.getProperties(), self.requests, self.sources, self.number)
 
@@ -366,22 +403,29 @@ class Build(properties.PropertiesMixin):
             self._locks_acquire_step.setBuild(self)
             yield self._locks_acquire_step.addStep()
 
-        # make sure properties are available to people listening on 'new'
-        # events
-        yield self.master.data.updates.setBuildProperties(self.buildid, self)
-        yield self.master.data.updates.setBuildStateString(self.buildid, 'starting')
-        yield self.master.data.updates.generateNewBuildEvent(self.buildid)
-
+        setup_failure = None
         try:
             self.setupBuild()  # create .steps
         except Exception:
-            yield self.buildPreparationFailure(Failure(), "setupBuild")
+            setup_failure = Failure()
+
+        # flush properties in the beginning of the build, this also makes sure properties are
+        # available to people listening on 'new' events
+        yield defer.gatherResults(
+            [
+                updates.setBuildProperties(self.buildid, self),
+                updates.setBuildStateString(self.buildid, 'starting'),
+            ],
+            consumeErrors=True,
+        ).addErrback(self._unwrap_first_error)
+        yield updates.generateNewBuildEvent(self.buildid)
+
+        if setup_failure is not None:
+            yield self.buildPreparationFailure(setup_failure, "setupBuild")
             yield self.buildFinished(['Build.setupBuild', 'failed'], EXCEPTION)
             return
 
-        # flush properties in the beginning of the build
-        yield self.master.data.updates.setBuildProperties(self.buildid, self)
-        yield self.master.data.updates.setBuildStateString(self.buildid, 'preparing worker')
+        yield updates.setBuildStateString(self.buildid, 'preparing worker')
         try:
             ready_or_failure = False
             if workerforbuilder.worker and workerforbuilder.worker.acquireLocks():
@@ -414,7 +458,7 @@ class Build(properties.PropertiesMixin):
         # TODO: This can unnecessarily suspend the starting of a build, in
         # situations where the worker is live but is pushing lots of data to
         # us in a build.
-        yield self.master.data.updates.setBuildStateString(self.buildid, 'pinging worker')
+        yield updates.setBuildStateString(self.buildid, 'pinging worker')
         log.msg(f"starting build {self}.. pinging the worker {workerforbuilder}")
         try:
             ping_success_or_failure = yield workerforbuilder.ping()
@@ -426,10 +470,10 @@ class Build(properties.PropertiesMixin):
             yield self.buildFinished(["worker", "not", "pinged"], RETRY)
             return
 
-        yield self.master.data.updates.setStepStateString(
+        yield updates.setStepStateString(
             self._preparation_step.stepid, f"worker {self.getWorkerName()} ready"
         )
-        yield self.master.data.updates.finishStep(self._preparation_step.stepid, SUCCESS, False)
+        yield updates.finishStep(self._preparation_step.stepid, SUCCESS, False)
 
         self.conn = workerforbuilder.worker.conn
 
@@ -450,40 +494,40 @@ class Build(properties.PropertiesMixin):
             return
 
         if self._locks_to_acquire:
-            yield self.master.data.updates.setBuildStateString(self.buildid, "acquiring locks")
+            yield updates.setBuildStateString(self.buildid, "acquiring locks")
             locks_acquire_start_at = int(self.master.reactor.seconds())
-            yield self.master.data.updates.startStep(
+            yield updates.startStep(
                 self._locks_acquire_step.stepid, started_at=locks_acquire_start_at
             )
             yield self.acquireLocks()
             locks_acquired_at = int(self.master.reactor.seconds())
-            yield self.master.data.updates.set_step_locks_acquired_at(
-                self._locks_acquire_step.stepid, locks_acquired_at=locks_acquired_at
-            )
-            yield self.master.data.updates.add_build_locks_duration(
-                self.buildid, duration_s=locks_acquired_at - locks_acquire_start_at
-            )
-            yield self.master.data.updates.setStepStateString(
-                self._locks_acquire_step.stepid, "locks acquired"
-            )
-            yield self.master.data.updates.finishStep(
-                self._locks_acquire_step.stepid, SUCCESS, False
-            )
-
-        yield self.master.data.updates.setBuildStateString(self.buildid, 'building')
+            yield defer.gatherResults(
+                [
+                    updates.set_step_locks_acquired_at(
+                        self._locks_acquire_step.stepid, locks_acquired_at=locks_acquired_at
+                    ),
+                    updates.add_build_locks_duration(
+                        self.buildid, duration_s=locks_acquired_at - locks_acquire_start_at
+                    ),
+                    updates.setStepStateString(self._locks_acquire_step.stepid, "locks acquired"),
+                ],
+                consumeErrors=True,
+            ).addErrback(self._unwrap_first_error)
+            yield updates.finishStep(self._locks_acquire_step.stepid, SUCCESS, False)
+
+        yield updates.setBuildStateString(self.buildid, 'building')
 
         # start the sequence of steps
         self.startNextStep()
 
     @defer.inlineCallbacks
     def buildPreparationFailure(self, why, state_string):
+        updates = self.master.data.updates
         if self.stopped:
             # if self.stopped, then this failure is a LatentWorker's failure to substantiate
             # which we triggered on purpose in stopBuild()
             log.msg("worker stopped while " + state_string, why)
-            yield self.master.data.updates.finishStep(
-                self._preparation_step.stepid, CANCELLED, False
-            )
+            yield updates.finishStep(self._preparation_step.stepid, CANCELLED, False)
         else:
             log.err(why, "while " + state_string)
             self.workerforbuilder.worker.putInQuarantine()
@@ -491,12 +535,10 @@ class Build(properties.PropertiesMixin):
                 yield self._preparation_step.addLogWithFailure(why)
             elif isinstance(why, Exception):
                 yield self._preparation_step.addLogWithException(why)
-            yield self.master.data.updates.setStepStateString(
+            yield updates.setStepStateString(
                 self._preparation_step.stepid, "error while " + state_string
             )
-            yield self.master.data.updates.finishStep(
-                self._preparation_step.stepid, EXCEPTION, False
-            )
+            yield updates.finishStep(self._preparation_step.stepid, EXCEPTION, False)
 
     def acquireLocks(self, res=None):
         self._acquiringLock = None
@@ -515,37 +557,46 @@ class Build(properties.PropertiesMixin):
         # all locks are available, claim them all
         for lock, access in self._locks_to_acquire:
             lock.claim(self, access)
+        self._owned_locks = list(self._locks_to_acquire)
         return defer.succeed(None)
 
     def setUniqueStepName(self, step):
         # If there are any name collisions, we add a count to the loser
         # until it is unique.
         name = step.name
-        if name in self.stepnames:
-            count = self.stepnames[name]
+        count = self.stepnames.get(name)
+        if count is None:
+            self.stepnames[name] = 0
+        else:
             count += 1
             self.stepnames[name] = count
             name = f"{step.name}_{count}"
-        else:
-            self.stepnames[name] = 0
         step.name = name
 
+    @staticmethod
+    def _unwrap_first_error(failure):
+        # report the failure of the update itself rather than the FirstError of gatherResults
+        failure.trap(defer.FirstError)
+        return failure.value.subFailure
+
     def setupBuildSteps(self, step_factories):
+        worker = self.workerforbuilder.worker
+        use_progress = self.useProgress
         steps = []
         for factory in step_factories:
             step = buildstep.create_step_from_step_or_factory(factory)
             step.setBuild(self)
-            step.setWorker(self.workerforbuilder.worker)
+            step.setWorker(worker)
             steps.append(step)
 
-            if self.useProgress:
+            if use_progress:
                 step.setupProgress()
         return steps
 
     def setupBuild(self):
         # create the actual BuildSteps.
 
-        self.steps = self.setupBuildSteps(self.stepFactories)
+        self.steps = deque(self.setupBuildSteps(self.stepFactories))
 
         owners = set(self.blamelist())
         # gather owners from build requests
@@ -557,7 +608,7 @@ class Build(properties.PropertiesMixin):
     def addStepsAfterCurrentStep(self, step_factories):
         # Add the new steps after the step that is running.
         # The running step has already been popped from self.steps
-        self.steps[0:0] = self.setupBuildSteps(step_factories)
+        self.steps.extendleft(reversed(self.setupBuildSteps(step_factories)))
 
     def addStepsAfterLastStep(self, step_factories):
         # Add the new steps to the end.
@@ -574,13 +625,13 @@ class Build(properties.PropertiesMixin):
         if self.terminate or self.stopped:
             # Run any remaining alwaysRun steps, and skip over the others
             while True:
-                s = self.steps.pop(0)
+                s = self.steps.popleft()
                 if s.alwaysRun:
                     return s
                 if not self.steps:
                     return None
         else:
-            return self.steps.pop(0)
+            return self.steps.popleft()
 
     def startNextStep(self):
         try:
@@ -598,9 +649,10 @@ class Build(properties.PropertiesMixin):
 
     @defer.inlineCallbacks
     def _start_next_step_impl(self, step):
+        updates = self.master.data.updates
         try:
             results = yield step.startStep(self.conn)
-            yield self.master.data.updates.setBuildProperties(self.buildid, self)
+            yield updates.setBuildProperties(self.buildid, self)
 
             self.currentStep = None
             if self.finished:
@@ -615,13 +667,13 @@ class Build(properties.PropertiesMixin):
             log.msg(f"{self} build got exception when running step {step}")
             log.err(e)
 
-            yield self.master.data.updates.setBuildProperties(self.buildid, self)
+            yield updates.setBuildProperties(self.buildid, self)
 
             # Note that buildFinished can't throw exception
             yield self.buildFinished(["build", "exception"], EXCEPTION)
 
-    @defer.inlineCallbacks
-    def stepDone(self, results, step):
+    @async_to_deferred
+    async def stepDone(self, results, step):
         """This method is called when the BuildStep completes. It is passed a
         status object from the BuildStep and is responsible for merging the
         Step's results into those of the overall Build."""
@@ -630,16 +682,14 @@ class Build(properties.PropertiesMixin):
         text = None
         if isinstance(results, tuple):
             results, text = results
-        assert isinstance(results, type(SUCCESS)), f"got {repr(results)}"
-        summary = yield step.getBuildResultSummary()
+        assert isinstance(results, int), f"got {repr(results)}"
+        summary = await defer.maybeDeferred(step.getBuildResultSummary)
         if 'build' in summary:
             text = [summary['build']]
         log.msg(f" step '{step.name}' complete: {statusToString(results)} ({text})")
         if text:
             self.text.extend(text)
-            self.master.data.updates.setBuildStateString(
-                self.buildid, bytes2unicode(" ".join(self.text))
-            )
+            self.master.data.updates.setBuildStateString(self.buildid, " ".join(self.text))
         self.results, terminate = computeResultAndTermination(step, results, self.results)
         if not self.conn:
             # force the results to retry if the connection was lost
@@ -660,7 +710,6 @@ class Build(properties.PropertiesMixin):
             log.msg(" stopping currentStep", self.currentStep)
             self.currentStep.interrupt(Failure(error.ConnectionLost()))
         else:
-            self.text = ["lost", "connection"]
             self.stopped = True
             if self._acquiringLock:
                 lock, access, d = self._acquiringLock
@@ -669,8 +718,8 @@ class Build(properties.PropertiesMixin):
     def controlStopBuild(self, key, params):
         return self.stopBuild(**params)
 
-    @defer.inlineCallbacks
-    def stopBuild(self, reason="<no reason given>", results=CANCELLED):
+    @async_to_deferred
+    async def stopBuild(self, reason="<no reason given>", results=CANCELLED):
         # the idea here is to let the user cancel a build because, e.g.,
         # they realized they committed a bug and they don't want to waste
         # the time building something that they know will fail. Another
@@ -684,7 +733,7 @@ class Build(properties.PropertiesMixin):
         self.stopped_reason = reason
         self.stopped = True
         if self.currentStep and self.currentStep.results is None:
-            yield self.currentStep.interrupt(reason)
+            await defer.maybeDeferred(self.currentStep.interrupt, reason)
 
         self.results = results
 
@@ -697,25 +746,14 @@ class Build(properties.PropertiesMixin):
             self.workerforbuilder.insubstantiate_if_needed()
 
     def allStepsDone(self):
-        if self.results == FAILURE:
-            text = ["failed"]
-        elif self.results == WARNINGS:
-            text = ["warnings"]
-        elif self.results == EXCEPTION:
-            text = ["exception"]
-        elif self.results == RETRY:
-            text = ["retry"]
-        elif self.results == CANCELLED:
-            text = ["cancelled"]
-        else:
-            text = ["build", "successful"]
+        text = [*_RESULTS_TEXT.get(self.results, ("build", "successful"))]
         if self.stopped_reason is not None:
-            text.extend([f'({self.stopped_reason})'])
-        text.extend(self.text)
+            text.append(f'({self.stopped_reason})')
+        text += self.text
         return self.buildFinished(text, self.results)
 
-    @defer.inlineCallbacks
-    def buildFinished(self, text, results):
+    @async_to_deferred
+    async def buildFinished(self, text, results):
         """This method must be called when the last Step has completed. It
         marks the Build as complete and returns the Builder to the 'idle'
         state.
@@ -740,10 +778,10 @@ class Build(properties.PropertiesMixin):
             eventually(self.releaseLocks)
             metrics.MetricCountEvent.log('active_builds', -1)
 
-            yield self.master.data.updates.setBuildStateString(
-                self.buildid, bytes2unicode(" ".join(text))
+            # the final state string is stored together with the results
+            await self.master.data.updates.finishBuild(
+                self.buildid, self.results, state_string=" ".join(text)
             )
-            yield self.master.data.updates.finishBuild(self.buildid, self.results)
 
             if self.results == EXCEPTION:
                 # When a build has an exception, put the worker in quarantine for a few seconds
@@ -772,9 +810,10 @@ class Build(properties.PropertiesMixin):
         if self._locks_to_acquire:
             log.msg(f"releaseLocks({self}): {self._locks_to_acquire}")
 
-        for lock, access in self._locks_to_acquire:
-            if lock.isOwner(self, access):
-                lock.release(self, access)
+        owned_locks = self._owned_locks
+        self._owned_locks = []
+        for lock, access in owned_locks:
+            lock.release(self, access)
 
         self._tryScheduleBuildsAfterLockUnlock(locks_released=True)
 
@@ -804,29 +843,30 @@ class Build(properties.PropertiesMixin):
             self.builder.botmaster.maybeStartBuildsForAllBuilders()
 
     def getSummaryStatistic(self, name, summary_fn, initial_value=_sentinel):
+        # a single lookup per step; the sentinel tells missing statistics from None values
         step_stats_list = [
-            st.getStatistic(name) for st in self.executedSteps if st.hasStatistic(name)
+            value
+            for value in (st.getStatistic(name, self._sentinel) for st in self.executedSteps)
+            if value is not self._sentinel
         ]
         if initial_value is self._sentinel:
             return reduce(summary_fn, step_stats_list)
         return reduce(summary_fn, step_stats_list, initial_value)
 
-    @defer.inlineCallbacks
     def getUrl(self):
-        builder_id = yield self.getBuilderId()
-        return getURLForBuild(self.master, builder_id, self.number)
+        d = self.getBuilderId()
+        d.addCallback(lambda builder_id: getURLForBuild(self.master, builder_id, self.number))
+        return d
 
-    @defer.inlineCallbacks
     def get_buildid(self):
         if self.buildid is not None:
-            return self.buildid
-        buildid = yield self._buildid_notifier.wait()
-        return buildid
+            return defer.succeed(self.buildid)
+        return self._buildid_notifier.wait()
 
-    @defer.inlineCallbacks
-    def waitUntilFinished(self):
-        buildid = yield self.get_buildid()
-        yield self.master.mq.waitUntilEvent(
+    @async_to_deferred
+    async def waitUntilFinished(self):
+        buildid = await self.get_buildid()
+        await self.master.mq.waitUntilEvent(
             ('builds', str(buildid), 'finished'), lambda: self.finished
         )
 
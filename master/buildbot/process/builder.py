@@ -383,7 +383,7 @@ class Builder(util_service.ReconfigurableServiceMixin, service.MultiService):
         props.build = build
 
         yield Build.setup_properties_known_before_build_starts(
-            props, build.requests, build.builder, workerforbuilder
+            props, build.requests, build.builder, workerforbuilder, sources=build.sources
         )
 
         log.msg(f"starting build {build} using worker {workerforbuilder}")
@@ -20,12 +20,14 @@ import weakref
 
 from twisted.internet import defer
 from twisted.python.components import registerAdapter
+from twisted.python.failure import Failure
 from zope.interface import implementer
 
 from buildbot import config
 from buildbot import util
 from buildbot.interfaces import IProperties
 from buildbot.interfaces import IRenderable
+from buildbot.util import Notifier
 from buildbot.util import flatten
 
 
@@ -58,6 +60,8 @@ class Properties(util.ComparableMixin):
         self.runtime = set()
         self.build = None  # will be set by the Build when starting
         self._used_secrets = {}
+        # renderings of cacheable renderables, keyed by id() of the renderable
+        self._rendering_cache = {}
         if kwargs:
             self.update(kwargs, "TEST")
         self._master = None
@@ -124,12 +128,15 @@ class Properties(util.ComparableMixin):
     def __getstate__(self):
         d = self.__dict__.copy()
         d['build'] = None
+        d['_rendering_cache'] = {}
         return d
 
     def __setstate__(self, d):
         self.__dict__ = d
         if not hasattr(self, 'runtime'):
             self.runtime = set()
+        if not hasattr(self, '_rendering_cache'):
+            self._rendering_cache = {}
 
     def __contains__(self, name):
         return name in self.properties
@@ -185,6 +192,8 @@ class Properties(util.ComparableMixin):
 
     has_key = hasProperty
 
+    get = getProperty
+
     def setProperty(self, name, value, source, runtime=False):
         name = util.bytes2unicode(name)
         if not IRenderable.providedBy(value):
@@ -203,8 +212,38 @@ class Properties(util.ComparableMixin):
 
     def render(self, value):
         renderable = IRenderable(value)
+        if getattr(renderable, 'cacheable', False):
+            return self._render_cached(renderable)
         return defer.maybeDeferred(renderable.getRenderingFor, self)
 
+    def _render_cached(self, renderable):
+        # The renderable is stored alongside the result so that its id() can't be reused while
+        # the entry is alive. Concurrent renderings wait for the first one to complete.
+        key = id(renderable)
+        entry = self._rendering_cache.get(key)
+        if entry is not None:
+            _, notifier, result = entry
+            if notifier is not None:
+                return notifier.wait()
+            return defer.succeed(result)
+
+        notifier = Notifier()
+        self._rendering_cache[key] = (renderable, notifier, None)
+
+        d = defer.maybeDeferred(renderable.getRenderingFor, self)
+
+        @d.addBoth
+        def done(result):
+            if isinstance(result, Failure):
+                # don't cache failures, next render() will try again
+                del self._rendering_cache[key]
+            else:
+                self._rendering_cache[key] = (renderable, None, result)
+            notifier.notify(result)
+            return result
+
+        return d
+
     # as the secrets are used in the renderable, they can pretty much arrive anywhere
     # in the log of state strings
     # so we have the renderable record here which secrets are used that we must remove
@@ -106,19 +106,13 @@ class ReporterBase(service.BuildbotService):
                 yield pending_call
 
         try:
-            reports = []
-            for g in self.generators:
-                if self._does_generator_want_key(g, key):
-                    try:
-                        report = yield g.generate(self.master, self, key, msg)
-                        if report is not None:
-                            reports.append(report)
-                    except Exception as e:
-                        log.err(
-                            e,
-                            "Got exception when handling reporter events: "
-                            f"key: {key} generator: {g}",
-                        )
+            # generators are independent of each other, so run them concurrently
+            results = yield defer.gatherResults([
+                self._generate_report(g, key, msg)
+                for g in self.generators
+                if self._does_generator_want_key(g, key)
+            ])
+            reports = [report for report in results if report is not None]
 
             if reports:
                 yield self.sendMessage(reports)
@@ -130,6 +124,19 @@ class ReporterBase(service.BuildbotService):
                 del self._pending_got_event_calls[chain_key]
             d.callback(None)  # This event is now fully handled
 
+    @defer.inlineCallbacks
+    def _generate_report(self, generator, key, msg):
+        try:
+            report = yield generator.generate(self.master, self, key, msg)
+            return report
+        except Exception as e:
+            log.err(
+                e,
+                "Got exception when handling reporter events: "
+                f"key: {key} generator: {generator}",
+            )
+            return None
+
     def getResponsibleUsersForBuild(self, master, buildid):
         # Use library method but subclassers may want to override that
         return utils.getResponsibleUsersForBuild(master, buildid)
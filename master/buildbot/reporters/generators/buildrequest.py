@@ -56,8 +56,11 @@ class BuildRequestGenerator(BuildStatusGeneratorMixin):
         buildrequest = yield BuildRequest.fromBrdict(master, brdict)
         builder = yield master.botmaster.getBuilderById(brdict.builderid)
 
-        yield Build.setup_properties_known_before_build_starts(props, [buildrequest], builder)
-        Build.setupBuildProperties(props, [buildrequest])
+        sources = buildrequest.mergeSourceStampsWith([])
+        yield Build.setup_properties_known_before_build_starts(
+            props, [buildrequest], builder, sources=sources
+        )
+        Build.setupBuildProperties(props, [buildrequest], sources)
 
         bdict['properties'] = props.asDict()
         yield utils.get_details_for_buildrequest(master, brdict, bdict)
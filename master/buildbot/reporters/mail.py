@@ -86,6 +86,9 @@ class Domain(util.ComparableMixin):
             return name
         return name + "@" + self.domain
 
+    def getAddresses(self, names):
+        return [self.getAddress(name) for name in names]
+
 
 @implementer(interfaces.IEmailSender)
 class MailNotifier(ReporterBase):
@@ -296,10 +299,14 @@ class MailNotifier(ReporterBase):
         recipients = set()
         if self.sendToInterestedUsers:
             if self.lookup:
-                dl = []
-                for u in users:
-                    dl.append(defer.maybeDeferred(self.lookup.getAddress, u))
-                users = yield defer.gatherResults(dl)
+                get_addresses = getattr(self.lookup, 'getAddresses', None)
+                if get_addresses is not None:
+                    users = yield defer.maybeDeferred(get_addresses, list(users))
+                else:
+                    dl = []
+                    for u in users:
+                        dl.append(defer.maybeDeferred(self.lookup.getAddress, u))
+                    users = yield defer.gatherResults(dl)
 
             for r in users:
                 if r is None:  # getAddress didn't like this address
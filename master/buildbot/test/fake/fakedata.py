@@ -349,9 +349,13 @@ class FakeUpdates(service.AsyncService):
         validation.verifyType(self.testcase, 'duration_s', duration_s, validation.IntValidator())
         return defer.succeed(None)
 
-    def finishBuild(self, buildid, results):
+    def finishBuild(self, buildid, results, state_string=None):
         validation.verifyType(self.testcase, 'buildid', buildid, validation.IntValidator())
         validation.verifyType(self.testcase, 'results', results, validation.IntValidator())
+        if state_string is not None:
+            validation.verifyType(
+                self.testcase, 'state_string', state_string, validation.StringValidator()
+            )
         return defer.succeed(None)
 
     def setBuildProperty(self, buildid, name, value, source):
@@ -167,12 +167,17 @@ class FakeBuildsComponent(FakeDBComponent):
             b['state_string'] = state_string
         return defer.succeed(None)
 
-    def finishBuild(self, buildid, results):
+    def finishBuild(self, buildid, results, state_string=None):
         now = self.reactor.seconds()
         b = self.builds.get(buildid)
         if b:
             b['complete_at'] = now
             b['results'] = results
+            if state_string is not None:
+                validation.verifyType(
+                    self.t, 'state_string', state_string, validation.StringValidator()
+                )
+                b['state_string'] = state_string
         return defer.succeed(None)
 
     def getBuildProperties(self, bid, resultSpec=None):
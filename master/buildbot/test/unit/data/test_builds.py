@@ -443,10 +443,23 @@ class Build(interfaces.InterfaceTests, TestReactorMixin, unittest.TestCase):
             self.master.data.updates.finishBuild,  # fake
             self.rtype.finishBuild,
         )  # real
-        def finishBuild(self, buildid, results):
+        def finishBuild(self, buildid, results, state_string=None):
             pass
 
     def test_finishBuild(self):
         return self.do_test_callthrough(
-            'finishBuild', self.rtype.finishBuild, buildid=15, results=3
+            'finishBuild',
+            self.rtype.finishBuild,
+            exp_kwargs={"buildid": 15, "results": 3, "state_string": None},
+            buildid=15,
+            results=3,
+        )
+
+    def test_finishBuild_state_string(self):
+        return self.do_test_callthrough(
+            'finishBuild',
+            self.rtype.finishBuild,
+            buildid=15,
+            results=3,
+            state_string='build successful',
         )
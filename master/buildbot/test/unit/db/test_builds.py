@@ -159,7 +159,7 @@ class Tests(interfaces.InterfaceTests):
 
     def test_signature_finishBuild(self):
         @self.assertArgSpecMatches(self.db.builds.finishBuild)
-        def finishBuild(self, buildid, results):
+        def finishBuild(self, buildid, results, state_string=None):
             pass
 
     def test_signature_getBuildProperties(self):
@@ -446,6 +446,16 @@ class Tests(interfaces.InterfaceTests):
             ),
         )
 
+    @defer.inlineCallbacks
+    def test_finishBuild_state_string(self):
+        self.reactor.advance(TIME4)
+        yield self.insert_test_data(self.backgroundData + [self.threeBuilds[0]])
+        yield self.db.builds.finishBuild(buildid=50, results=7, state_string='build failed')
+        bdict = yield self.db.builds.getBuild(50)
+        self.assertEqual(bdict.complete_at, epoch2datetime(TIME4))
+        self.assertEqual(bdict.results, 7)
+        self.assertEqual(bdict.state_string, 'build failed')
+
     @defer.inlineCallbacks
     def testgetBuildPropertiesEmpty(self):
         yield self.insert_test_data(self.backgroundData + self.threeBuilds)
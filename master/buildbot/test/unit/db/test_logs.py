@@ -14,10 +14,7 @@
 # Copyright Buildbot Team Members
 
 
-import base64
-import bz2
 import textwrap
-import zlib
 
 import sqlalchemy as sa
 from twisted.internet import defer
@@ -29,6 +26,15 @@ from buildbot.test.util import connector_component
 from buildbot.test.util import interfaces
 from buildbot.util import bytes2unicode
 from buildbot.util import unicode2bytes
+from buildbot.util.twisted import async_to_deferred
+
+try:
+    import lz4
+
+    [lz4]
+    hasLz4 = True
+except ImportError:
+    hasLz4 = False
 
 
 class Tests(interfaces.InterfaceTests):
@@ -76,15 +82,19 @@ class Tests(interfaces.InterfaceTests):
             logid=201, first_line=6, last_line=6, compressed=0, content="yet another line"
         ),
     ]
-    bug3101Content = base64.b64decode("""
-        PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT09PT0
-        9PT09PT09PT09PT09PT09PT09PT09PT09PT09PQpbU0tJUFBFRF0Kbm90IGEgd2luMz
-        IgcGxhdGZvcm0KCmJ1aWxkc2xhdmUudGVzdC51bml0LnRlc3RfcnVucHJvY2Vzcy5UZ
-        XN0UnVuUHJvY2Vzcy50ZXN0UGlwZVN0cmluZwotLS0tLS0tLS0tLS0tLS0tLS0tLS0t
-        LS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0tLS0
-        tLS0tLS0tClJhbiAyNjcgdGVzdHMgaW4gNS4zNzhzCgpQQVNTRUQgKHNraXBzPTEsIH
-        N1Y2Nlc3Nlcz0yNjYpCnByb2dyYW0gZmluaXNoZWQgd2l0aCBleGl0IGNvZGUgMAplb
-        GFwc2VkVGltZT04LjI0NTcwMg==""")
+    bug3101Content = (
+        b"===============================================================================\n"
+        b"[SKIPPED]\n"
+        b"not a win32 platform\n"
+        b"\n"
+        b"buildslave.test.unit.test_runprocess.TestRunProcess.testPipeString\n"
+        b"-------------------------------------------------------------------------------\n"
+        b"Ran 267 tests in 5.378s\n"
+        b"\n"
+        b"PASSED (skips=1, successes=266)\n"
+        b"program finished with exit code 0\n"
+        b"elapsedTime=8.245702"
+    )
 
     bug3101Rows = [
         fakedb.Log(
@@ -101,8 +111,8 @@ class Tests(interfaces.InterfaceTests):
         ),
     ]
 
-    @defer.inlineCallbacks
-    def checkTestLogLines(self):
+    @async_to_deferred
+    async def checkTestLogLines(self):
         expLines = [
             'line zero',
             'line 1' + "x" * 200,
@@ -114,11 +124,11 @@ class Tests(interfaces.InterfaceTests):
         ]
         for first_line in range(0, 7):
             for last_line in range(first_line, 7):
-                got_lines = yield self.db.logs.getLogLines(201, first_line, last_line)
+                got_lines = await self.db.logs.getLogLines(201, first_line, last_line)
                 self.assertEqual(got_lines, "\n".join(expLines[first_line : last_line + 1] + [""]))
         # check overflow
         self.assertEqual(
-            (yield self.db.logs.getLogLines(201, 5, 20)), "\n".join(expLines[5:7] + [""])
+            (await self.db.logs.getLogLines(201, 5, 20)), "\n".join(expLines[5:7] + [""])
         )
 
     # signature tests
@@ -170,9 +180,9 @@ class Tests(interfaces.InterfaceTests):
 
     # method tests
 
-    @defer.inlineCallbacks
-    def test_getLog(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_getLog(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -186,7 +196,7 @@ class Tests(interfaces.InterfaceTests):
                 ),
             ]
         )
-        logdict = yield self.db.logs.getLog(201)
+        logdict = await self.db.logs.getLog(201)
         self.assertIsInstance(logdict, logs.LogModel)
         self.assertEqual(
             logdict,
@@ -201,14 +211,14 @@ class Tests(interfaces.InterfaceTests):
             ),
         )
 
-    @defer.inlineCallbacks
-    def test_getLog_missing(self):
-        logdict = yield self.db.logs.getLog(201)
+    @async_to_deferred
+    async def test_getLog_missing(self):
+        logdict = await self.db.logs.getLog(201)
         self.assertEqual(logdict, None)
 
-    @defer.inlineCallbacks
-    def test_getLogBySlug(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_getLogBySlug(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -231,13 +241,13 @@ class Tests(interfaces.InterfaceTests):
                 ),
             ]
         )
-        logdict = yield self.db.logs.getLogBySlug(101, 'dbg_log')
+        logdict = await self.db.logs.getLogBySlug(101, 'dbg_log')
         self.assertIsInstance(logdict, logs.LogModel)
         self.assertEqual(logdict.id, 202)
 
-    @defer.inlineCallbacks
-    def test_getLogBySlug_missing(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_getLogBySlug_missing(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -251,12 +261,12 @@ class Tests(interfaces.InterfaceTests):
                 ),
             ]
         )
-        logdict = yield self.db.logs.getLogBySlug(102, 'stdio')
+        logdict = await self.db.logs.getLogBySlug(102, 'stdio')
         self.assertEqual(logdict, None)
 
-    @defer.inlineCallbacks
-    def test_getLogs(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_getLogs(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -288,22 +298,22 @@ class Tests(interfaces.InterfaceTests):
                 ),
             ]
         )
-        logdicts = yield self.db.logs.getLogs(101)
+        logdicts = await self.db.logs.getLogs(101)
         for logdict in logdicts:
             self.assertIsInstance(logdict, logs.LogModel)
         self.assertEqual(sorted([ld.id for ld in logdicts]), [201, 202])
 
-    @defer.inlineCallbacks
-    def test_getLogLines(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
-        yield self.checkTestLogLines()
+    @async_to_deferred
+    async def test_getLogLines(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
+        await self.checkTestLogLines()
 
         # check line number reversal
-        self.assertEqual((yield self.db.logs.getLogLines(201, 6, 3)), '')
+        self.assertEqual((await self.db.logs.getLogLines(201, 6, 3)), '')
 
-    @defer.inlineCallbacks
-    def test_getLogLines_empty(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_getLogLines_empty(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -317,28 +327,28 @@ class Tests(interfaces.InterfaceTests):
                 ),
             ]
         )
-        self.assertEqual((yield self.db.logs.getLogLines(201, 9, 99)), '')
-        self.assertEqual((yield self.db.logs.getLogLines(999, 9, 99)), '')
+        self.assertEqual((await self.db.logs.getLogLines(201, 9, 99)), '')
+        self.assertEqual((await self.db.logs.getLogLines(999, 9, 99)), '')
 
-    @defer.inlineCallbacks
-    def test_getLogLines_bug3101(self):
+    @async_to_deferred
+    async def test_getLogLines_bug3101(self):
         # regression test for #3101
         content = self.bug3101Content
-        yield self.insert_test_data(self.backgroundData + self.bug3101Rows)
+        await self.insert_test_data(self.backgroundData + self.bug3101Rows)
         # overall content is the same, with '\n' padding at the end
         expected = bytes2unicode(self.bug3101Content + b'\n')
-        self.assertEqual((yield self.db.logs.getLogLines(1470, 0, 99)), expected)
+        self.assertEqual((await self.db.logs.getLogLines(1470, 0, 99)), expected)
         # try to fetch just one line
-        expected = bytes2unicode(content.split(b'\n')[0] + b'\n')
-        self.assertEqual((yield self.db.logs.getLogLines(1470, 0, 0)), expected)
+        expected = bytes2unicode(content.splitlines(keepends=True)[0])
+        self.assertEqual((await self.db.logs.getLogLines(1470, 0, 0)), expected)
 
-    @defer.inlineCallbacks
-    def test_addLog_getLog(self):
-        yield self.insert_test_data(self.backgroundData)
-        logid = yield self.db.logs.addLog(
+    @async_to_deferred
+    async def test_addLog_getLog(self):
+        await self.insert_test_data(self.backgroundData)
+        logid = await self.db.logs.addLog(
             stepid=101, name='config.log', slug='config_log', type='t'
         )
-        logdict = yield self.db.logs.getLog(logid)
+        logdict = await self.db.logs.getLog(logid)
         self.assertIsInstance(logdict, logs.LogModel)
         self.assertEqual(
             logdict,
@@ -353,19 +363,19 @@ class Tests(interfaces.InterfaceTests):
             ),
         )
 
-    @defer.inlineCallbacks
-    def test_appendLog_getLogLines(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
-        logid = yield self.db.logs.addLog(stepid=102, name='another', slug='another', type='s')
-        self.assertEqual((yield self.db.logs.appendLog(logid, 'xyz\n')), (0, 0))
-        self.assertEqual((yield self.db.logs.appendLog(201, 'abc\ndef\n')), (7, 8))
-        self.assertEqual((yield self.db.logs.appendLog(logid, 'XYZ\n')), (1, 1))
-        self.assertEqual((yield self.db.logs.getLogLines(201, 6, 7)), "yet another line\nabc\n")
-        self.assertEqual((yield self.db.logs.getLogLines(201, 7, 8)), "abc\ndef\n")
-        self.assertEqual((yield self.db.logs.getLogLines(201, 8, 8)), "def\n")
-        self.assertEqual((yield self.db.logs.getLogLines(logid, 0, 1)), "xyz\nXYZ\n")
+    @async_to_deferred
+    async def test_appendLog_getLogLines(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
+        logid = await self.db.logs.addLog(stepid=102, name='another', slug='another', type='s')
+        self.assertEqual((await self.db.logs.appendLog(logid, 'xyz\n')), (0, 0))
+        self.assertEqual((await self.db.logs.appendLog(201, 'abc\ndef\n')), (7, 8))
+        self.assertEqual((await self.db.logs.appendLog(logid, 'XYZ\n')), (1, 1))
+        self.assertEqual((await self.db.logs.getLogLines(201, 6, 7)), "yet another line\nabc\n")
+        self.assertEqual((await self.db.logs.getLogLines(201, 7, 8)), "abc\ndef\n")
+        self.assertEqual((await self.db.logs.getLogLines(201, 8, 8)), "def\n")
+        self.assertEqual((await self.db.logs.getLogLines(logid, 0, 1)), "xyz\nXYZ\n")
         self.assertEqual(
-            (yield self.db.logs.getLog(logid)),
+            (await self.db.logs.getLog(logid)),
             logs.LogModel(
                 complete=False,
                 id=logid,
@@ -377,51 +387,54 @@ class Tests(interfaces.InterfaceTests):
             ),
         )
 
-    @defer.inlineCallbacks
-    def test_compressLog(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
-        yield self.db.logs.compressLog(201)
+    @async_to_deferred
+    async def test_compressLog(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
+        await self.db.logs.compressLog(201)
         # test log lines should still be readable just the same
-        yield self.checkTestLogLines()
+        await self.checkTestLogLines()
 
-    @defer.inlineCallbacks
-    def test_addLogLines_big_chunk(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_addLogLines_big_chunk(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         self.assertEqual(
-            (yield self.db.logs.appendLog(201, 'abc\n' * 20000)),  # 80k
+            (await self.db.logs.appendLog(201, 'abc\n' * 20000)),  # 80k
             (7, 20006),
         )
-        lines = yield self.db.logs.getLogLines(201, 7, 50000)
+        lines = await self.db.logs.getLogLines(201, 7, 50000)
         self.assertEqual(len(lines), 80000)
         self.assertEqual(lines, ('abc\n' * 20000))
 
-    @defer.inlineCallbacks
-    def test_addLogLines_big_chunk_big_lines(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_addLogLines_big_chunk_big_lines(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'x' * 33000 + '\n'
         self.assertEqual(
-            (yield self.db.logs.appendLog(201, line * 3)), (7, 9)
+            (await self.db.logs.appendLog(201, line * 3)), (7, 9)
         )  # three long lines, all truncated
-        lines = yield self.db.logs.getLogLines(201, 7, 100)
+        lines = await self.db.logs.getLogLines(201, 7, 100)
         self.assertEqual(len(lines), 99003)
         self.assertEqual(lines, (line * 3))
 
 
 class RealTests(Tests):
-    @defer.inlineCallbacks
-    def test_addLogLines_db(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
-        self.assertEqual((yield self.db.logs.appendLog(201, 'abc\ndef\nghi\njkl\n')), (7, 10))
-
+    def get_appended_chunk(self):
+        # returns the first chunk appended after the 7 lines of testLogLines
         def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
+            tbl = self.db.model.logchunks
+            res = conn.execute(tbl.select().where(tbl.c.first_line > 6)).mappings()
             row = res.fetchone()
             res.close()
             return dict(row)
 
-        newRow = yield self.db.pool.do(thd)
+        return self.db.pool.do(thd)
+
+    @async_to_deferred
+    async def test_addLogLines_db(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
+        self.assertEqual((await self.db.logs.appendLog(201, 'abc\ndef\nghi\njkl\n')), (7, 10))
+
+        newRow = await self.get_appended_chunk()
         self.assertEqual(
             newRow,
             {
@@ -433,13 +446,13 @@ class RealTests(Tests):
             },
         )
 
-    @defer.inlineCallbacks
-    def test_addLogLines_huge_lines(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_addLogLines_huge_lines(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'xy' * 70000 + '\n'
-        yield self.db.logs.appendLog(201, line * 3)
+        await self.db.logs.appendLog(201, line * 3)
         for lineno in 7, 8, 9:
-            line = yield self.db.logs.getLogLines(201, lineno, lineno)
+            line = await self.db.logs.getLogLines(201, lineno, lineno)
             self.assertEqual(len(line), 65537)
 
     def test_splitBigChunk_unicode_misalignment(self):
@@ -452,42 +465,26 @@ class RealTests(Tests):
         self.assertEqual(len(chunk), 65534)
         chunk.decode('utf-8')
 
-    @defer.inlineCallbacks
-    def test_no_compress_small_chunk(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_no_compress_small_chunk(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         self.db.master.config.logCompressionMethod = "gz"
-        self.assertEqual((yield self.db.logs.appendLog(201, 'abc\n')), (7, 7))
-
-        def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
-            row = res.fetchone()
-            res.close()
-            return dict(row)
+        self.assertEqual((await self.db.logs.appendLog(201, 'abc\n')), (7, 7))
 
-        newRow = yield self.db.pool.do(thd)
+        newRow = await self.get_appended_chunk()
         self.assertEqual(
             newRow,
             {'logid': 201, 'first_line': 7, 'last_line': 7, 'content': b'abc', 'compressed': 0},
         )
 
-    @defer.inlineCallbacks
-    def test_raw_compress_big_chunk(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_raw_compress_big_chunk(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'xy' * 10000
         self.db.master.config.logCompressionMethod = "raw"
-        self.assertEqual((yield self.db.logs.appendLog(201, line + '\n')), (7, 7))
+        self.assertEqual((await self.db.logs.appendLog(201, line + '\n')), (7, 7))
 
-        def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
-            row = res.fetchone()
-            res.close()
-            return dict(row)
-
-        newRow = yield self.db.pool.do(thd)
+        newRow = await self.get_appended_chunk()
         self.assertEqual(
             newRow,
             {
@@ -499,97 +496,57 @@ class RealTests(Tests):
             },
         )
 
-    @defer.inlineCallbacks
-    def test_gz_compress_big_chunk(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_gz_compress_big_chunk(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'xy' * 10000
         self.db.master.config.logCompressionMethod = "gz"
-        self.assertEqual((yield self.db.logs.appendLog(201, line + '\n')), (7, 7))
+        self.assertEqual((await self.db.logs.appendLog(201, line + '\n')), (7, 7))
 
-        def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
-            row = res.fetchone()
-            res.close()
-            return dict(row)
-
-        newRow = yield self.db.pool.do(thd)
+        newRow = await self.get_appended_chunk()
+        self.assertEqual(logs.read_gzip(newRow.pop('content')), unicode2bytes(line))
         self.assertEqual(
             newRow,
-            {
-                'logid': 201,
-                'first_line': 7,
-                'last_line': 7,
-                'content': zlib.compress(unicode2bytes(line), 9),
-                'compressed': 1,
-            },
+            {'logid': 201, 'first_line': 7, 'last_line': 7, 'compressed': 1},
         )
 
-    @defer.inlineCallbacks
-    def test_bz2_compress_big_chunk(self):
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+    @async_to_deferred
+    async def test_bz2_compress_big_chunk(self):
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'xy' * 10000
         self.db.master.config.logCompressionMethod = "bz2"
-        self.assertEqual((yield self.db.logs.appendLog(201, line + '\n')), (7, 7))
+        self.assertEqual((await self.db.logs.appendLog(201, line + '\n')), (7, 7))
 
-        def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
-            row = res.fetchone()
-            res.close()
-            return dict(row)
-
-        newRow = yield self.db.pool.do(thd)
+        newRow = await self.get_appended_chunk()
+        self.assertEqual(logs.read_bz2(newRow.pop('content')), unicode2bytes(line))
         self.assertEqual(
             newRow,
-            {
-                'logid': 201,
-                'first_line': 7,
-                'last_line': 7,
-                'content': bz2.compress(unicode2bytes(line), 9),
-                'compressed': 2,
-            },
+            {'logid': 201, 'first_line': 7, 'last_line': 7, 'compressed': 2},
         )
 
-    @defer.inlineCallbacks
-    def test_lz4_compress_big_chunk(self):
-        try:
-            import lz4  # noqa pylint: disable=unused-import,import-outside-toplevel
-        except ImportError as e:
-            raise unittest.SkipTest("lz4 not installed, skip the test") from e
+    @async_to_deferred
+    async def test_lz4_compress_big_chunk(self):
+        if not hasLz4:
+            raise unittest.SkipTest("lz4 not installed, skip the test")
 
-        yield self.insert_test_data(self.backgroundData + self.testLogLines)
+        await self.insert_test_data(self.backgroundData + self.testLogLines)
         line = 'xy' * 10000
         self.db.master.config.logCompressionMethod = "lz4"
-        self.assertEqual((yield self.db.logs.appendLog(201, line + '\n')), (7, 7))
+        self.assertEqual((await self.db.logs.appendLog(201, line + '\n')), (7, 7))
 
-        def thd(conn):
-            res = conn.execute(
-                self.db.model.logchunks.select().where(self.db.model.logchunks.c.first_line > 6)
-            ).mappings()
-            row = res.fetchone()
-            res.close()
-            return dict(row)
-
-        newRow = yield self.db.pool.do(thd)
+        newRow = await self.get_appended_chunk()
+        self.assertEqual(logs.read_lz4(newRow.pop('content')), unicode2bytes(line))
         self.assertEqual(
             newRow,
-            {
-                'logid': 201,
-                'first_line': 7,
-                'last_line': 7,
-                'content': logs.dumps_lz4(line.encode('utf-8')),
-                'compressed': 3,
-            },
+            {'logid': 201, 'first_line': 7, 'last_line': 7, 'compressed': 3},
         )
 
-    @defer.inlineCallbacks
-    def do_addLogLines_huge_log(self, NUM_CHUNKS=3000, chunk=('xy' * 70 + '\n') * 3):
+    @async_to_deferred
+    async def do_addLogLines_huge_log(self, NUM_CHUNKS=3000, chunk=('xy' * 70 + '\n') * 3):
         if chunk.endswith("\n"):
             chunk = chunk[:-1]
         linesperchunk = chunk.count("\n") + 1
+        num_lines = NUM_CHUNKS * linesperchunk
         test_data = [
             fakedb.LogChunk(
                 logid=201,
@@ -600,7 +557,7 @@ class RealTests(Tests):
             )
             for i in range(NUM_CHUNKS)
         ]
-        yield self.insert_test_data(
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -609,17 +566,18 @@ class RealTests(Tests):
                     name='stdio',
                     slug='stdio',
                     complete=0,
-                    num_lines=NUM_CHUNKS * 3,
+                    num_lines=num_lines,
                     type='s',
                 )
             ]
             + test_data
         )
-        wholeLog = yield self.db.logs.getLogLines(201, 0, NUM_CHUNKS * 3)
-        for i in range(10):
-            yield self.db.logs.compressLog(201)
-            wholeLog2 = yield self.db.logs.getLogLines(201, 0, NUM_CHUNKS * 3)
-            self.assertEqual(wholeLog, wholeLog2)
+        wholeLog = await self.db.logs.getLogLines(201, 0, num_lines - 1)
+        self.assertEqual(wholeLog, (chunk + '\n') * NUM_CHUNKS)
+        for _ in range(10):
+            await self.db.logs.compressLog(201)
+        # any content lost or corrupted by one of the passes would still show up here
+        wholeLog2 = await self.db.logs.getLogLines(201, 0, num_lines - 1)
         self.assertEqual(wholeLog, wholeLog2)
 
         def countChunk(conn):
@@ -628,11 +586,14 @@ class RealTests(Tests):
             q = q.where(tbl.c.logid == 201)
             return conn.execute(q).fetchone()[0]
 
-        chunks = yield self.db.pool.do(countChunk)
+        chunks = await self.db.pool.do(countChunk)
         # make sure MAX_CHUNK_LINES is taken in account
         self.assertGreaterEqual(
             chunks, NUM_CHUNKS * linesperchunk / logs.LogsConnectorComponent.MAX_CHUNK_LINES
         )
+        # the compression has converged: yet another pass has nothing left to gather
+        self.assertEqual(await self.db.logs.compressLog(201), 0)
+        self.assertEqual(await self.db.pool.do(countChunk), chunks)
 
     def test_addLogLines_huge_log(self):
         return self.do_addLogLines_huge_log()
@@ -643,15 +604,15 @@ class RealTests(Tests):
     def test_addLogLines_huge_log_lots_snowmans(self):
         return self.do_addLogLines_huge_log(NUM_CHUNKS=3000, chunk='\N{SNOWMAN}\n' * 50)
 
-    @defer.inlineCallbacks
-    def test_compressLog_non_existing_log(self):
-        yield self.db.logs.compressLog(201)
-        logdict = yield self.db.logs.getLog(201)
+    @async_to_deferred
+    async def test_compressLog_non_existing_log(self):
+        await self.db.logs.compressLog(201)
+        logdict = await self.db.logs.getLog(201)
         self.assertEqual(logdict, None)
 
-    @defer.inlineCallbacks
-    def test_compressLog_empty_log(self):
-        yield self.insert_test_data(
+    @async_to_deferred
+    async def test_compressLog_empty_log(self):
+        await self.insert_test_data(
             self.backgroundData
             + [
                 fakedb.Log(
@@ -665,8 +626,8 @@ class RealTests(Tests):
                 ),
             ]
         )
-        yield self.db.logs.compressLog(201)
-        logdict = yield self.db.logs.getLog(201)
+        await self.db.logs.compressLog(201)
+        logdict = await self.db.logs.getLog(201)
         self.assertEqual(
             logdict,
             logs.LogModel(
@@ -680,38 +641,38 @@ class RealTests(Tests):
             ),
         )
 
-    @defer.inlineCallbacks
-    def test_deleteOldLogChunks_basic(self):
-        yield self.insert_test_data(self.backgroundData)
+    @async_to_deferred
+    async def test_deleteOldLogChunks_basic(self):
+        await self.insert_test_data(self.backgroundData)
         logids = []
         for stepid in (101, 102):
             for i in range(stepid):
-                logid = yield self.db.logs.addLog(
+                logid = await self.db.logs.addLog(
                     stepid=stepid, name='another' + str(i), slug='another' + str(i), type='s'
                 )
-                yield self.db.logs.appendLog(logid, 'xyz\n')
+                await self.db.logs.appendLog(logid, 'xyz\n')
                 logids.append(logid)
 
-        deleted_chunks = yield self.db.logs.deleteOldLogChunks(
+        deleted_chunks = await self.db.logs.deleteOldLogChunks(
             (self.TIMESTAMP_STEP102 + self.TIMESTAMP_STEP101) / 2
         )
         self.assertEqual(deleted_chunks, 101)
-        deleted_chunks = yield self.db.logs.deleteOldLogChunks(
+        deleted_chunks = await self.db.logs.deleteOldLogChunks(
             self.TIMESTAMP_STEP102 + self.TIMESTAMP_STEP101
         )
         self.assertEqual(deleted_chunks, 102)
-        deleted_chunks = yield self.db.logs.deleteOldLogChunks(
+        deleted_chunks = await self.db.logs.deleteOldLogChunks(
             self.TIMESTAMP_STEP102 + self.TIMESTAMP_STEP101
         )
         self.assertEqual(deleted_chunks, 0)
-        deleted_chunks = yield self.db.logs.deleteOldLogChunks(0)
+        deleted_chunks = await self.db.logs.deleteOldLogChunks(0)
         self.assertEqual(deleted_chunks, 0)
         for logid in logids:
-            logdict = yield self.db.logs.getLog(logid)
+            logdict = await self.db.logs.getLog(logid)
             self.assertEqual(logdict.type, 'd')
 
             # we make sure we can still getLogLines, it will just return empty value
-            lines = yield self.db.logs.getLogLines(logid, 0, logdict.num_lines)
+            lines = await self.db.logs.getLogLines(logid, 0, logdict.num_lines)
             self.assertEqual(lines, '')
 
 
@@ -16,7 +16,6 @@
 import operator
 import posixpath
 from unittest.mock import Mock
-from unittest.mock import call
 
 from twisted.internet import defer
 from twisted.trial import unittest
@@ -24,6 +23,7 @@ from zope.interface import implementer
 
 from buildbot import interfaces
 from buildbot.locks import WorkerLock
+from buildbot.process import build
 from buildbot.process.build import Build
 from buildbot.process.buildstep import BuildStep
 from buildbot.process.buildstep import create_step_from_step_or_factory
@@ -37,9 +37,9 @@ from buildbot.process.results import RETRY
 from buildbot.process.results import SUCCESS
 from buildbot.process.results import WARNINGS
 from buildbot.test.fake import fakemaster
-from buildbot.test.fake import fakeprotocol
 from buildbot.test.fake import worker
 from buildbot.test.reactor import TestReactorMixin
+from buildbot.util.twisted import async_to_deferred
 
 
 class FakeChange:
@@ -192,7 +192,7 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.worker.attached(None)
         self.builder = FakeBuilder(self.master)
         self.build = Build([r], self.builder)
-        self.build.conn = fakeprotocol.FakeConnection(self.worker)
+        self.build.conn = self.worker.conn
         self.build.workername = self.worker.workername
 
         self.workerforbuilder = Mock(name='workerforbuilder')
@@ -222,6 +222,17 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         lock._old_claim = lock.claim
         lock.claim = claim
 
+    async def setup_build_lock(self, b, lock, mode='counting', claim_log=None):
+        # sets up b to take lock in the given mode and returns the real lock and the access
+        lock_access = lock.access(mode)
+        b.setLocks([lock_access])
+        await b._setup_locks()
+
+        real_lock = b._locks_to_acquire[0][0]
+        if claim_log is not None:
+            self._setup_lock_claim_log(real_lock, claim_log)
+        return real_lock, lock_access
+
     def testRunSuccessfulBuild(self):
         b = self.build
 
@@ -290,8 +301,8 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertEqual(b.results, RETRY)
         self.assertWorkerPreparationFailure('error while worker_prepare')
 
-    @defer.inlineCallbacks
-    def testAlwaysRunStepStopBuild(self):
+    @async_to_deferred
+    async def testAlwaysRunStepStopBuild(self):
         """Test that steps marked with alwaysRun=True still get run even if
         the build is stopped."""
 
@@ -327,14 +338,14 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         step2.startStep = startStep2
         step1.stepDone = lambda: False
 
-        yield b.startBuild(self.workerforbuilder)
+        await b.startBuild(self.workerforbuilder)
 
         self.assertEqual(b.results, CANCELLED)
         self.assertIn('stop it', step1.interrupted)
         self.assertTrue(step2Started[0])
 
-    @defer.inlineCallbacks
-    def test_start_step_throws_exception(self):
+    @async_to_deferred
+    async def test_start_step_throws_exception(self):
         b = self.build
 
         step1 = self.create_fake_build_step()
@@ -347,7 +358,7 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
 
         step1.startStep = startStep
 
-        yield b.startBuild(self.workerforbuilder)
+        await b.startBuild(self.workerforbuilder)
 
         self.assertEqual(b.results, EXCEPTION)
         self.flushLoggedErrors(TestException)
@@ -358,28 +369,32 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         b.builder.config.workerbuilddir = 'test'
         self.workerforbuilder.worker.worker_basedir = "/srv/buildbot/worker"
         self.workerforbuilder.worker.path_module = posixpath
-        b.getProperties = Mock()
-        b.setProperty = Mock()
 
         b.setupWorkerBuildirProperty(self.workerforbuilder)
 
-        expected_path = '/srv/buildbot/worker/test'
-
-        b.setProperty.assert_has_calls([call('builddir', expected_path, 'Worker')], any_order=True)
+        self.assertEqual(b.getProperty('builddir'), '/srv/buildbot/worker/test')
+        self.assertEqual(b.getProperties().getPropertySource('builddir'), 'Worker')
 
-    @defer.inlineCallbacks
-    def testBuildLocksAcquired(self):
+    @async_to_deferred
+    async def test_setup_locks_no_locks(self):
         b = self.build
+        get_real_locks = Mock()
+        self.patch(build, 'get_real_locks_from_accesses', get_real_locks)
 
-        lock = WorkerLock('lock')
-        claim_log = []
-        lock_access = lock.access('counting')
-        lock.access = lambda mode: lock_access
+        b._setup_locks_impl = Mock()
 
-        b.setLocks([lock_access])
-        yield b._setup_locks()
+        await b._setup_locks()
 
-        self._setup_lock_claim_log(b._locks_to_acquire[0][0], claim_log)
+        self.assertEqual(b._locks_to_acquire, [])
+        get_real_locks.assert_not_called()
+        b._setup_locks_impl.assert_not_called()
+
+    @async_to_deferred
+    async def testBuildLocksAcquired(self):
+        b = self.build
+
+        claim_log = []
+        await self.setup_build_lock(b, WorkerLock('lock'), claim_log=claim_log)
 
         step = self.create_fake_build_step()
         b.setStepFactories([FakeStepFactory(step)])
@@ -389,8 +404,25 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertEqual(b.results, SUCCESS)
         self.assertEqual(len(claim_log), 1)
 
-    @defer.inlineCallbacks
-    def testBuildLocksOrder(self):
+    @async_to_deferred
+    async def test_build_locks_released(self):
+        b = self.build
+
+        real_lock, lock_access = await self.setup_build_lock(b, WorkerLock('lock'), 'exclusive')
+
+        step = self.create_fake_build_step()
+        b.setStepFactories([FakeStepFactory(step)])
+
+        await b.startBuild(self.workerforbuilder)
+        self.assertEqual(b.results, SUCCESS)
+        self.assertTrue(real_lock.isOwner(b, lock_access))
+
+        self.reactor.advance(0)  # releaseLocks is called via eventually()
+        self.assertFalse(real_lock.isOwner(b, lock_access))
+        self.assertEqual(b._owned_locks, [])
+
+    @async_to_deferred
+    async def testBuildLocksOrder(self):
         """Test that locks are acquired in FIFO order; specifically that
         counting locks cannot jump ahead of exclusive locks"""
         eBuild = self.build
@@ -410,16 +442,8 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         lock = WorkerLock('lock', 2)
         claim_log = []
 
-        eBuild.setLocks([lock.access('exclusive')])
-        yield eBuild._setup_locks()
-
-        cBuild.setLocks([lock.access('counting')])
-        yield cBuild._setup_locks()
-
-        self._setup_lock_claim_log(eBuild._locks_to_acquire[0][0], claim_log)
-        self._setup_lock_claim_log(cBuild._locks_to_acquire[0][0], claim_log)
-
-        real_lock = eBuild._locks_to_acquire[0][0]
+        real_lock, _ = await self.setup_build_lock(eBuild, lock, 'exclusive', claim_log)
+        await self.setup_build_lock(cBuild, lock, 'counting', claim_log)
 
         b3 = Mock()
         b3_access = lock.access('counting')
@@ -435,28 +459,22 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
 
         real_lock.release(b3, b3_access)
 
-        yield d
+        await d
         self.assertEqual(eBuild.results, SUCCESS)
         self.assertEqual(cBuild.results, SUCCESS)
         self.assertEqual(claim_log, [b3, eBuild, cBuild])
 
-    @defer.inlineCallbacks
-    def testBuildWaitingForLocks(self):
+    @async_to_deferred
+    async def testBuildWaitingForLocks(self):
         b = self.build
 
         claim_log = []
-
         lock = WorkerLock('lock')
-        lock_access = lock.access('counting')
-
-        b.setLocks([lock_access])
-        yield b._setup_locks()
-        self._setup_lock_claim_log(b._locks_to_acquire[0][0], claim_log)
+        real_lock, _ = await self.setup_build_lock(b, lock, claim_log=claim_log)
 
         step = self.create_fake_build_step()
         b.setStepFactories([FakeStepFactory(step)])
 
-        real_lock = b._locks_to_acquire[0][0]
         real_lock.claim(Mock(), lock.access('counting'))
 
         b.startBuild(self.workerforbuilder)
@@ -465,21 +483,17 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertTrue(b.currentStep is None)
         self.assertTrue(b._acquiringLock is not None)
 
-    @defer.inlineCallbacks
-    def testStopBuildWaitingForLocks(self):
+    @async_to_deferred
+    async def testStopBuildWaitingForLocks(self):
         b = self.build
 
         lock = WorkerLock('lock')
-        lock_access = lock.access('counting')
-
-        b.setLocks([lock_access])
-        yield b._setup_locks()
+        real_lock, _ = await self.setup_build_lock(b, lock)
 
         step = self.create_fake_build_step()
         step.alwaysRun = False
         b.setStepFactories([FakeStepFactory(step)])
 
-        real_lock = b._locks_to_acquire[0][0]
         real_lock.claim(Mock(), lock.access('counting'))
 
         def acquireLocks(res=None):
@@ -494,22 +508,17 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertTrue(b.currentStep is None)
         self.assertEqual(b.results, CANCELLED)
 
-    @defer.inlineCallbacks
-    def testStopBuildWaitingForLocks_lostRemote(self):
+    @async_to_deferred
+    async def testStopBuildWaitingForLocks_lostRemote(self):
         b = self.build
 
         lock = WorkerLock('lock')
-        lock_access = lock.access('counting')
-        lock.access = lambda mode: lock_access
-
-        b.setLocks([lock_access])
-        yield b._setup_locks()
+        real_lock, _ = await self.setup_build_lock(b, lock)
 
         step = self.create_fake_build_step()
         step.alwaysRun = False
         b.setStepFactories([FakeStepFactory(step)])
 
-        real_lock = b._locks_to_acquire[0][0]
         real_lock.claim(Mock(), lock.access('counting'))
 
         def acquireLocks(res=None):
@@ -524,14 +533,14 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertTrue(b.currentStep is None)
         self.assertEqual(b.results, RETRY)
 
-    @defer.inlineCallbacks
-    def testStopBuildWaitingForStepLocks(self):
+    @async_to_deferred
+    async def testStopBuildWaitingForStepLocks(self):
         b = self.build
 
         lock = WorkerLock('lock')
         lock_access = lock.access('counting')
 
-        locks = yield get_real_locks_from_accesses([lock_access], b)
+        locks = await get_real_locks_from_accesses([lock_access], b)
 
         step = create_step_from_step_or_factory(BuildStep(locks=[lock_access]))
         b.setStepFactories([FakeStepFactory(step)])
@@ -685,6 +694,36 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         self.assertEqual(b.getSummaryStatistic('casualties', add), 11)
         self.assertEqual(b.getSummaryStatistic('casualties', add, 10), 21)
 
+    def test_allStepsDone_text(self):
+        b = self.build
+        b.buildFinished = Mock()
+        b.text = ['step', 'text']
+
+        for results, expected in [
+            (SUCCESS, ['build', 'successful']),
+            (WARNINGS, ['warnings']),
+            (FAILURE, ['failed']),
+            (EXCEPTION, ['exception']),
+            (RETRY, ['retry']),
+            (CANCELLED, ['cancelled']),
+        ]:
+            b.results = results
+            b.allStepsDone()
+            b.buildFinished.assert_called_with([*expected, 'step', 'text'], results)
+
+        b.stopped_reason = 'stopped'
+        b.allStepsDone()
+        b.buildFinished.assert_called_with(['cancelled', '(stopped)', 'step', 'text'], CANCELLED)
+
+    def test_getSummaryStatistic_none_value(self):
+        b = self.build
+
+        b.executedSteps = [BuildStep(), BuildStep(), BuildStep()]
+        b.executedSteps[0].setStatistic('value', 'a')
+        b.executedSteps[1].setStatistic('value', None)
+
+        self.assertEqual(b.getSummaryStatistic('value', lambda a, b: [a, b]), ['a', None])
+
     def create_fake_steps(self, names):
         steps = []
 
@@ -698,15 +737,15 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
             steps.append(step)
         return steps
 
-    @defer.inlineCallbacks
-    def test_start_build_sets_properties(self):
+    @async_to_deferred
+    async def test_start_build_sets_properties(self):
         b = self.build
         b.setProperty("foo", "bar", "test")
 
         step = create_step_from_step_or_factory(self.create_fake_build_step())
         b.setStepFactories([FakeStepFactory(step)])
 
-        yield b.startBuild(self.workerforbuilder)
+        await b.startBuild(self.workerforbuilder)
         self.assertEqual(b.results, SUCCESS)
 
         # remove duplicates, note that set() can't be used as properties contain complex
@@ -730,8 +769,54 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
             ],
         )
 
-    @defer.inlineCallbacks
-    def testAddStepsAfterCurrentStep(self):
+    @async_to_deferred
+    async def test_start_build_properties_flushed_before_new_event(self):
+        b = self.build
+        step = create_step_from_step_or_factory(self.create_fake_build_step())
+        b.setStepFactories([FakeStepFactory(step)])
+
+        props_at_new_event = []
+
+        def generateNewBuildEvent(buildid):
+            props_at_new_event.extend(p[1] for p in self.master.data.updates.properties)
+            return defer.succeed(None)
+
+        self.master.data.updates.generateNewBuildEvent = generateNewBuildEvent
+
+        await b.startBuild(self.workerforbuilder)
+        self.assertEqual(b.results, SUCCESS)
+        self.assertIn('owners', props_at_new_event)
+        self.assertEqual(len(props_at_new_event), len(set(props_at_new_event)))
+
+    @async_to_deferred
+    async def test_start_build_failed_properties_update_propagates_error(self):
+        b = self.build
+        step = self.create_fake_build_step()
+        b.setStepFactories([FakeStepFactory(step)])
+
+        self.master.data.updates.setBuildProperties = lambda buildid, props: defer.fail(
+            TestException()
+        )
+
+        with self.assertRaises(TestException):
+            await b.startBuild(self.workerforbuilder)
+
+    @async_to_deferred
+    async def test_start_build_failed_locks_update_propagates_error(self):
+        b = self.build
+        await self.setup_build_lock(b, WorkerLock('lock'))
+        step = self.create_fake_build_step()
+        b.setStepFactories([FakeStepFactory(step)])
+
+        self.master.data.updates.add_build_locks_duration = lambda buildid, duration_s: defer.fail(
+            TestException()
+        )
+
+        with self.assertRaises(TestException):
+            await b.startBuild(self.workerforbuilder)
+
+    @async_to_deferred
+    async def testAddStepsAfterCurrentStep(self):
         b = self.build
 
         steps = self.create_fake_steps(["a", "b", "c"])
@@ -744,14 +829,14 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         steps[1].startStep = startStepB
         b.setStepFactories([FakeStepFactory(s) for s in steps])
 
-        yield b.startBuild(self.workerforbuilder)
+        await b.startBuild(self.workerforbuilder)
         self.assertEqual(b.results, SUCCESS)
         expected_names = ["a", "b", "d", "e", "c"]
         executed_names = [s.name for s in b.executedSteps]
         self.assertEqual(executed_names, expected_names)
 
-    @defer.inlineCallbacks
-    def testAddStepsAfterLastStep(self):
+    @async_to_deferred
+    async def testAddStepsAfterLastStep(self):
         b = self.build
 
         steps = self.create_fake_steps(["a", "b", "c"])
@@ -764,7 +849,7 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         steps[1].startStep = startStepB
         b.setStepFactories([FakeStepFactory(s) for s in steps])
 
-        yield b.startBuild(self.workerforbuilder)
+        await b.startBuild(self.workerforbuilder)
         self.assertEqual(b.results, SUCCESS)
         expected_names = ["a", "b", "c", "d", "e"]
         executed_names = [s.name for s in b.executedSteps]
@@ -814,22 +899,46 @@ class TestBuild(TestReactorMixin, unittest.TestCase):
         executed_names = [s.name for s in b.executedSteps]
         self.assertEqual(executed_names, expected_names)
 
-    @defer.inlineCallbacks
-    def testGetUrl(self):
+    @async_to_deferred
+    async def testGetUrl(self):
         self.build.number = 3
-        url = yield self.build.getUrl()
+        url = await self.build.getUrl()
         self.assertEqual(url, 'http://localhost:8080/#/builders/83/builds/3')
 
-    @defer.inlineCallbacks
-    def testGetUrlForVirtualBuilder(self):
+    @async_to_deferred
+    async def testGetUrlForVirtualBuilder(self):
         # Let's fake a virtual builder
         self.builder._builders['wilma'] = 108
         self.build.setProperty('virtual_builder_name', 'wilma', 'Build')
         self.build.setProperty('virtual_builder_tags', ['_virtual_'])
         self.build.number = 33
-        url = yield self.build.getUrl()
+        url = await self.build.getUrl()
         self.assertEqual(url, 'http://localhost:8080/#/builders/108/builds/33')
 
+    @async_to_deferred
+    async def test_getBuilderId_virtual_builder_does_not_modify_config_tags(self):
+        self.builder._builders['wilma'] = 108
+        self.builder.config.tags = ['tag']
+        self.build.setProperty('virtual_builder_name', 'wilma', 'Build')
+        self.master.data.updates.updateBuilderInfo = Mock()
+
+        builderid = await self.build.getBuilderId()
+
+        self.assertEqual(builderid, 108)
+        self.assertEqual(self.builder.config.tags, ['tag'])
+        self.master.data.updates.updateBuilderInfo.assert_called_once_with(
+            108, self.builder.config.description, None, None, None, ['tag', '_virtual_']
+        )
+
+    @async_to_deferred
+    async def test_getBuilderId_cached(self):
+        self.builder.getBuilderId = Mock(return_value=defer.succeed(83))
+        builderid = await self.build.getBuilderId()
+        self.assertEqual(builderid, 83)
+        builderid = await self.build.getBuilderId()
+        self.assertEqual(builderid, 83)
+        self.builder.getBuilderId.assert_called_once_with()
+
     def test_active_builds_metric(self):
         """
         The number of active builds is increased when a build starts
@@ -927,6 +1036,24 @@ class TestMultipleSourceStamps(TestReactorMixin, unittest.TestCase):
         self.assertTrue(source3 is not None)
         self.assertEqual([source3.repository, source3.revision], ["repoC", "111213"])
 
+    def test_buildReturnSourceStamp_unknown_codebase(self):
+        self.assertIsNone(self.build.getSourceStamp("D"))
+
+    def test_buildReturnSourceStamp_sources_reassigned(self):
+        self.assertEqual(self.build.getSourceStamp("A").repository, "repoA")
+        self.assertEqual(len(list(self.build.allChanges())), 6)
+
+        source = FakeSource()
+        source.repository = "repoD"
+        source.codebase = "A"
+        source.changes = [FakeChange(16)]
+        self.build.sources = [source]
+
+        self.assertIs(self.build.getSourceStamp("A"), source)
+        self.assertIsNone(self.build.getSourceStamp("B"))
+        self.assertEqual([c.number for c in self.build.allChanges()], [16])
+        self.assertEqual(self.build.blamelist(), ["me"])
+
 
 class TestBuildBlameList(TestReactorMixin, unittest.TestCase):
     def setUp(self):
@@ -970,6 +1097,35 @@ class TestBuildBlameList(TestReactorMixin, unittest.TestCase):
         # If no patch is set, author will not be est
         self.assertEqual(blamelist, [])
 
+    def test_blamelist_cached(self):
+        r = FakeRequest()
+        r.sources.extend([self.sourceByMe, self.sourceByHim])
+        build = Build([r], self.builder)
+        blamelist = build.blamelist()
+        blamelist.append('other')
+        self.sourceByMe.changes[0].who = "someone"
+        self.assertEqual(build.blamelist(), ['him', 'me'])
+        self.assertEqual([c.number for c in build.allChanges()], [10, 11, 12, 13])
+
+    def test_allFiles(self):
+        self.sourceByMe.changes[0].files = ['a', 'b']
+        self.sourceByMe.changes[1].files = []
+        self.sourceByHim.changes[0].files = ['c']
+        self.sourceByHim.changes[1].files = ['a']
+        r = FakeRequest()
+        r.sources.extend([self.sourceByMe, self.sourceByHim])
+        build = Build([r], self.builder)
+        self.assertEqual(build.allFiles(), ['a', 'b', 'c', 'a'])
+
+    def test_changesText(self):
+        for c in self.sourceByMe.changes:
+            c.asText = lambda c=c: f"change {c.number}"
+        r = FakeRequest()
+        r.sources.extend([self.sourceByMe])
+        build = Build([r], self.builder)
+        sep = "-" * 60 + "\n\n"
+        self.assertEqual(build.changesText(), f"{sep}change 10\n{sep}change 11\n")
+
 
 class TestSetupProperties_MultipleSources(TestReactorMixin, unittest.TestCase):
     """
@@ -1069,3 +1225,14 @@ class TestSetupProperties_SingleSource(TestReactorMixin, unittest.TestCase):
         Build.setupBuildProperties(self.build.getProperties(), [self.r], self.r.sources)
         project = self.props["Build"]["project"]
         self.assertEqual(project, '')
+
+    @async_to_deferred
+    async def test_properties_known_before_build_starts_reuse_sources(self):
+        self.r.sources[0].changes[0].properties.setProperty('prop', 'value', 'Change')
+        self.r.mergeSourceStampsWith = Mock()
+        props = Properties()
+        await Build.setup_properties_known_before_build_starts(
+            props, [self.r], self.builder, sources=self.r.sources
+        )
+        self.assertEqual(props.getProperty('prop'), 'value')
+        self.r.mergeSourceStampsWith.assert_not_called()
@@ -902,6 +902,12 @@ class TestProperties(unittest.TestCase):
         self.assertIn('do-tests', self.props)
         self.assertNotIn('missing-do-tests', self.props)
 
+    def test_get(self):
+        self.props.setProperty("do-tests", 1, "scheduler")
+        self.assertEqual(self.props.get('do-tests'), 1)
+        self.assertEqual(self.props.get('do-nothing'), None)
+        self.assertEqual(self.props.get('do-nothing', 2), 2)
+
     def testAsList(self):
         self.props.setProperty("happiness", 7, "builder")
         self.props.setProperty("flames", True, "tester")
@@ -1062,6 +1068,63 @@ class TestProperties(unittest.TestCase):
         res = yield self.props.render(Renderable())
         self.assertEqual(res, 'yz')
 
+    @defer.inlineCallbacks
+    def test_render_cacheable(self):
+        @implementer(IRenderable)
+        class Renderable:
+            cacheable = True
+            calls = 0
+
+            def getRenderingFor(self, props):
+                self.calls += 1
+                return 'value'
+
+        r = Renderable()
+        res1 = yield self.props.render(r)
+        res2 = yield self.props.render(r)
+        self.assertEqual((res1, res2), ('value', 'value'))
+        self.assertEqual(r.calls, 1)
+
+        # caching is per Properties instance
+        res3 = yield Properties().render(r)
+        self.assertEqual(res3, 'value')
+        self.assertEqual(r.calls, 2)
+
+    @defer.inlineCallbacks
+    def test_render_cacheable_concurrent(self):
+        r = DeferredRenderable()
+        r.cacheable = True
+
+        d1 = self.props.render(r)
+        d2 = self.props.render(r)
+        self.assertFalse(d1.called)
+        self.assertFalse(d2.called)
+        r.callback('value')
+
+        res1 = yield d1
+        res2 = yield d2
+        self.assertEqual((res1, res2), ('value', 'value'))
+
+    @defer.inlineCallbacks
+    def test_render_cacheable_failure_not_cached(self):
+        @implementer(IRenderable)
+        class Renderable:
+            cacheable = True
+            calls = 0
+
+            def getRenderingFor(self, props):
+                self.calls += 1
+                if self.calls == 1:
+                    raise RuntimeError('oh noes')
+                return 'value'
+
+        r = Renderable()
+        with self.assertRaises(RuntimeError):
+            yield self.props.render(r)
+        res = yield self.props.render(r)
+        self.assertEqual(res, 'value')
+        self.assertEqual(r.calls, 2)
+
 
 class MyPropertiesThing(PropertiesMixin):
     set_runtime_properties = True
@@ -190,6 +190,29 @@ class TestReporterBase(
         self.assertEqual(len(self.flushLoggedErrors(TestException)), 1)
         self.assertLogged('Got exception when handling reporter events')
 
+    @defer.inlineCallbacks
+    def test_generators_run_concurrently_for_same_event(self):
+        gen = self.setup_mock_generator([('builds', None, None)])
+        gen2 = self.setup_mock_generator([('builds', None, None)])
+
+        notifier = yield self.setupNotifier(generators=[gen, gen2])
+
+        gen.generate = mock.Mock(return_value=defer.Deferred())
+        gen2.generate = mock.Mock(return_value=defer.Deferred())
+
+        notifier._got_event(('builds', None, 'finished'), {'buildrequestid': 1})
+
+        # the second generator is started before the first one has finished
+        gen.generate.assert_called_once()
+        gen2.generate.assert_called_once()
+
+        gen2.generate.return_value.callback(2)
+        notifier.sendMessage.assert_not_called()
+        gen.generate.return_value.callback(1)
+
+        # reports keep the order of the generators
+        self.assertEqual(notifier.sendMessage.call_args_list, [mock.call([1, 2])])
+
     @defer.inlineCallbacks
     def test_reports_sent_in_order_despite_slow_generator(self):
         gen = self.setup_mock_generator([('builds', None, None)])
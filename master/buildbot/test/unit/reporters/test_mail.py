@@ -20,7 +20,9 @@ from unittest.mock import Mock
 
 from twisted.internet import defer
 from twisted.trial import unittest
+from zope.interface import implementer
 
+from buildbot import interfaces
 from buildbot.config import ConfigErrors
 from buildbot.process import properties
 from buildbot.process.properties import Interpolate
@@ -259,6 +261,36 @@ class TestMailNotifier(ConfigErrorsMixin, TestReactorMixin, unittest.TestCase, R
             exp_TO='"=?utf-8?q?Big_Bob?=" <bob@mayhem.net>, narrator@example.org',
         )
 
+    @defer.inlineCallbacks
+    def test_sendToInterestedUsers_lookup_getAddress(self):
+        @implementer(interfaces.IEmailLookup)
+        class Lookup:
+            def getAddress(self, name):
+                if name == 'narrator':
+                    return defer.succeed('narrator@example.org')
+                return None
+
+        mn = yield self.setupMailNotifier('from@example.org', lookup=Lookup())
+        recipients = yield mn.findInterrestedUsersEmails(['Big Bob <bob@mayhem.net>', 'narrator'])
+        self.assertEqual(recipients, {'narrator@example.org'})
+
+    @defer.inlineCallbacks
+    def test_sendToInterestedUsers_lookup_getAddresses(self):
+        @implementer(interfaces.IEmailLookup)
+        class Lookup:
+            def getAddress(self, name):
+                raise AssertionError('getAddress should not be called')
+
+            def getAddresses(self, names):
+                self.names = names
+                return defer.succeed([None, 'narrator@example.org'])
+
+        lookup = Lookup()
+        mn = yield self.setupMailNotifier('from@example.org', lookup=lookup)
+        recipients = yield mn.findInterrestedUsersEmails(['Big Bob <bob@mayhem.net>', 'narrator'])
+        self.assertEqual(recipients, {'narrator@example.org'})
+        self.assertEqual(lookup.names, ['Big Bob <bob@mayhem.net>', 'narrator'])
+
     def test_buildMessage_sendToInterestedUsers_no_lookup(self):
         return self.do_test_sendToInterestedUsers(
             exp_called_with=['Big Bob <bob@mayhem.net>'],
@@ -409,7 +409,8 @@ def fake_find_distribution_info_dups(entry_name, entry_group):
 @mock.patch('buildbot.plugins.db.entry_points', provide_fake_entry_points)
 class TestBuildbotPlugins(unittest.TestCase):
     def setUp(self):
-        buildbot.plugins.db._DB = buildbot.plugins.db._PluginDB()
+        # the plugin db caches the (fake) entry points, so it must not outlive the test
+        self.patch(buildbot.plugins.db, '_DB', buildbot.plugins.db._PluginDB())
 
     def test_check_group_registration(self):
         with mock.patch.object(buildbot.plugins.db, '_DB', db._PluginDB()):
@@ -423,6 +424,15 @@ class TestBuildbotPlugins(unittest.TestCase):
             self.assertEqual(registered, groups)
             self.assertEqual(registered, set(db.namespaces()))
 
+    @mock.patch('buildbot.plugins.db.find_distribution_info', fake_find_distribution_info)
+    def test_entry_points_scanned_once(self):
+        fake_entry_points = mock.Mock(return_value=_FAKE_ENTRIES)
+        with mock.patch('buildbot.plugins.db.entry_points', fake_entry_points):
+            self.assertIn('good', db.get_plugins('interface', interface=ITestInterface))
+            self.assertIn('good', db.get_plugins('no_interface'))
+
+        self.assertEqual(fake_entry_points.call_count, 1)
+
     @mock.patch('buildbot.plugins.db.find_distribution_info', fake_find_distribution_info)
     def test_interface_provided_simple(self):
         # Basic check before the actual test
@@ -81,6 +81,50 @@ class TestConfigResource(TestReactorMixin, www.WwwTestMixin, unittest.TestCase):
         }
         self.assertEqual(res, exp)
 
+    @defer.inlineCallbacks
+    def test_render_resolves_config_once(self):
+        _auth = auth.NoAuth()
+        _auth.maybeAutoLogin = mock.Mock()
+        _auth.getConfigDict = mock.Mock(return_value={"name": "NoAuth"})
+
+        master = self.make_master(url='h:/a/b/', auth=_auth)
+        rsrc = config.ConfigResource(master)
+        rsrc.reconfigResource(master.config)
+
+        for _ in range(2):
+            res = yield self.render_resource(rsrc, b'/config')
+            res = json.loads(bytes2unicode(res))
+            self.assertEqual(res["auth"], {"name": "NoAuth"})
+
+        self.assertEqual(_auth.getConfigDict.call_count, 1)
+
+    @defer.inlineCallbacks
+    def test_render_user_change(self):
+        _auth = auth.NoAuth()
+        _auth.maybeAutoLogin = mock.Mock()
+        _auth.getConfigDict = mock.Mock(return_value={"name": "NoAuth"})
+
+        master = self.make_master(url='h:/a/b/', auth=_auth)
+        rsrc = config.ConfigResource(master)
+        rsrc.reconfigResource(master.config)
+        master.session.user_info = {"anonymous": True}
+
+        res = yield self.render_resource(rsrc, b'/config')
+        self.assertEqual(json.loads(bytes2unicode(res))["user"], {"anonymous": True})
+
+        # the session user infos may be modified in place
+        master.session.user_info["name"] = "me"
+        res = yield self.render_resource(rsrc, b'/config')
+        self.assertEqual(json.loads(bytes2unicode(res))["user"], {"anonymous": True, "name": "me"})
+        self.assertEqual(_auth.getConfigDict.call_count, 2)
+
+    def test_frontend_config_keeps_values(self):
+        _auth = auth.NoAuth()
+        master = self.make_master(url='h:/a/b/', auth=_auth, plugins={'waterfall_view': ()})
+        frontend_config = config.get_www_frontend_config_dict(master, master.config.www)
+        self.assertIs(frontend_config['auth'], _auth)
+        self.assertEqual(frontend_config['plugins'], {'waterfall_view': ()})
+
 
 class IndexResource(TestReactorMixin, www.WwwTestMixin, unittest.TestCase):
     def setUp(self):
@@ -270,16 +270,15 @@ class RealDatabaseMixin:
         ]
 
         def thd(conn):
-            # insert into tables -- in order
+            # insert into tables -- in order, with a single statement per table
             for tbl in ordered_tables:
-                for row in [r for r in rows if r.table == tbl.name]:
-                    tbl = model.Model.metadata.tables[row.table]
-                    try:
-                        conn.execute(tbl.insert().values(row.values))
-                        conn.commit()
-                    except Exception:
-                        log.msg(f"while inserting {row} - {row.values}")
-                        raise
+                tbl_rows = [r for r in rows if r.table == tbl.name]
+                try:
+                    conn.execute(tbl.insert(), [r.values for r in tbl_rows])
+                    conn.commit()
+                except Exception:
+                    log.msg(f"while inserting into {tbl.name}: {tbl_rows}")
+                    raise
 
         yield self.db_pool.do(thd)
 
@@ -85,6 +85,36 @@ def serialize_www_frontend_config_dict_to_json(config):
     return json.dumps(config, default=to_json)
 
 
+class SerializedFrontendConfig:
+    """Serializes the frontend config extended with the per-request values.
+
+    Serializing the config calls getConfigDict() on every IConfigured object it
+    contains, so the last result is kept and reused for as long as the
+    per-request values (the user and the auto-login warning) do not change.
+    """
+
+    def __init__(self, frontend_config):
+        self.frontend_config = frontend_config
+        self._last_request_json = None
+        self._last_serialized = None
+
+    def serialize(self, user, on_load_warning=None):
+        request_config = {"user": user}
+        if on_load_warning is not None:
+            request_config["on_load_warning"] = on_load_warning
+        # the session may modify the user infos in place, so compare their serialized form
+        request_json = serialize_www_frontend_config_dict_to_json(request_config)
+        if request_json != self._last_request_json:
+            config = {}
+            if on_load_warning is not None:
+                config["on_load_warning"] = on_load_warning
+            config.update(self.frontend_config)
+            config["user"] = user
+            self._last_serialized = serialize_www_frontend_config_dict_to_json(config)
+            self._last_request_json = request_json
+        return self._last_serialized
+
+
 _known_theme_variables = (
     ("bb-sidebar-background-color", "#30426a"),
     ("bb-sidebar-header-background-color", "#273759"),
@@ -123,21 +153,17 @@ class ConfigResource(resource.Resource):
 
     def reconfigResource(self, new_config):
         self.frontend_config = get_www_frontend_config_dict(self.master, new_config.www)
+        self.serialized_config = SerializedFrontendConfig(self.frontend_config)
 
     def render_GET(self, request):
         return self.asyncRenderHelper(request, self.do_render)
 
     def do_render(self, request):
-        config = {}
         request.setHeader(b"content-type", b'application/json')
         request.setHeader(b"Cache-Control", b"public,max-age=0")
 
-        config.update(self.frontend_config)
-        config.update({"user": self.master.www.getUserInfos(request)})
-
-        return defer.succeed(
-            unicode2bytes(serialize_www_frontend_config_dict_to_json(config), encoding='ascii')
-        )
+        serialized_config = self.serialized_config.serialize(self.master.www.getUserInfos(request))
+        return defer.succeed(unicode2bytes(serialized_config, encoding='ascii'))
 
 
 class IndexResource(resource.Resource):
@@ -152,6 +178,7 @@ class IndexResource(resource.Resource):
     def reconfigResource(self, new_config):
         self.config = new_config.www
         self.frontend_config = get_www_frontend_config_dict(self.master, self.config)
+        self.serialized_config = SerializedFrontendConfig(self.frontend_config)
 
         self.custom_templates = {}
         template_dir = self.config.get('custom_templates_dir', None)
@@ -201,24 +228,25 @@ class IndexResource(resource.Resource):
 
     @defer.inlineCallbacks
     def renderIndex(self, request):
-        config = {}
+        on_load_warning = None
         request.setHeader(b"content-type", b'text/html')
         request.setHeader(b"Cache-Control", b"public,max-age=0")
 
         try:
             yield self.config['auth'].maybeAutoLogin(request)
         except Error as e:
-            config["on_load_warning"] = e.message
+            on_load_warning = e.message
 
-        config.update(self.frontend_config)
-        config.update({"user": self.master.www.getUserInfos(request)})
+        serialized_config = self.serialized_config.serialize(
+            self.master.www.getUserInfos(request), on_load_warning
+        )
 
         tpl = self.jinja.get_template('index.html')
         # we use Jinja in order to render some server side dynamic stuff
         # For example, custom_templates javascript is generated by the
         # layout.jade jinja template
         tpl = tpl.render(
-            configjson=serialize_www_frontend_config_dict_to_json(config),
+            configjson=serialized_config,
             custom_templates=self.custom_templates,
             config=self.config,
         )
@@ -238,26 +266,28 @@ class IndexResourceReact(resource.Resource):
     def reconfigResource(self, new_config):
         self.config = new_config.www
         self.frontend_config = get_www_frontend_config_dict(self.master, self.config)
+        self.serialized_config = SerializedFrontendConfig(self.frontend_config)
+        # the theme only comes from the configuration, never from the per-request values
+        self.serialized_css = serialize_www_frontend_theme_to_css(self.frontend_config, indent=8)
 
     def render_GET(self, request):
         return self.asyncRenderHelper(request, self.renderIndex)
 
     @defer.inlineCallbacks
     def renderIndex(self, request):
-        config = {}
+        on_load_warning = None
         request.setHeader(b"content-type", b'text/html')
         request.setHeader(b"Cache-Control", b"public,max-age=0")
 
         try:
             yield self.config['auth'].maybeAutoLogin(request)
         except Error as e:
-            config["on_load_warning"] = e.message
-
-        config.update(self.frontend_config)
-        config.update({"user": self.master.www.getUserInfos(request)})
+            on_load_warning = e.message
 
-        serialized_config = serialize_www_frontend_config_dict_to_json(config)
-        serialized_css = serialize_www_frontend_theme_to_css(config, indent=8)
+        serialized_config = self.serialized_config.serialize(
+            self.master.www.getUserInfos(request), on_load_warning
+        )
+        serialized_css = self.serialized_css
         rendered_index = self.index_template.replace(
             ' <!-- BUILDBOT_CONFIG_PLACEHOLDER -->',
             f"""<script id="bb-config">
@@ -0,0 +1 @@
+The ``finishBuild`` data and database API methods accept an optional ``state_string`` argument, so that a build is finished and its final state string is set in a single update.
@@ -0,0 +1 @@
+:bb:reporter:`MailNotifier` now resolves all interested users with a single ``getAddresses`` call when the configured email lookup object provides it.
@@ -0,0 +1 @@
+Renderables may now set a ``cacheable`` attribute so that :class:`Properties` renders them only once.